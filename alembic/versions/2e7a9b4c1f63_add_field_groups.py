@@ -0,0 +1,54 @@
+"""add field groups
+
+Revision ID: 2e7a9b4c1f63
+Revises: 9c3f6a1e2d84
+Create Date: 2026-10-19 20:03:51.287644
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2e7a9b4c1f63'
+down_revision: Union[str, Sequence[str], None] = '9c3f6a1e2d84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('field_groups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('bbox_west', sa.Float(), nullable=True),
+    sa.Column('bbox_south', sa.Float(), nullable=True),
+    sa.Column('bbox_east', sa.Float(), nullable=True),
+    sa.Column('bbox_north', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_field_groups_id'), 'field_groups', ['id'], unique=False)
+    op.create_index(op.f('ix_field_groups_user_id'), 'field_groups', ['user_id'], unique=False)
+    op.create_table('field_group_members',
+    sa.Column('group_id', sa.Integer(), nullable=False),
+    sa.Column('field_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['field_id'], ['fields.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['group_id'], ['field_groups.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('group_id', 'field_id')
+    )
+    op.create_index(op.f('ix_field_group_members_field_id'), 'field_group_members', ['field_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_field_group_members_field_id'), table_name='field_group_members')
+    op.drop_table('field_group_members')
+    op.drop_index(op.f('ix_field_groups_user_id'), table_name='field_groups')
+    op.drop_index(op.f('ix_field_groups_id'), table_name='field_groups')
+    op.drop_table('field_groups')
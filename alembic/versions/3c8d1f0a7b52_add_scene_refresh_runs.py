@@ -0,0 +1,39 @@
+"""add scene_refresh_runs table
+
+Revision ID: 3c8d1f0a7b52
+Revises: fe1a9ccd0904
+Create Date: 2026-10-19 09:12:44.318201
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c8d1f0a7b52'
+down_revision: Union[str, Sequence[str], None] = 'fe1a9ccd0904'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('scene_refresh_runs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('since', sa.DateTime(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=False),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('scenes_processed', sa.Integer(), nullable=False),
+    sa.Column('analyses_written', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_scene_refresh_runs_id'), 'scene_refresh_runs', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_scene_refresh_runs_id'), table_name='scene_refresh_runs')
+    op.drop_table('scene_refresh_runs')
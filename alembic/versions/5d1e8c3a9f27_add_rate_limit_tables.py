@@ -0,0 +1,48 @@
+"""add rate limit tables
+
+Revision ID: 5d1e8c3a9f27
+Revises: b6e2f9a4c715
+Create Date: 2026-10-19 18:42:07.519306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d1e8c3a9f27'
+down_revision: Union[str, Sequence[str], None] = 'b6e2f9a4c715'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('rate_limit_buckets',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('cost_class', sa.String(), nullable=False),
+    sa.Column('tokens', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'cost_class'),
+    prefixes=['UNLOGGED']
+    )
+    op.create_table('rate_limit_leases',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('cost_class', sa.String(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    prefixes=['UNLOGGED']
+    )
+    op.create_index('ix_rate_limit_leases_user_class', 'rate_limit_leases', ['user_id', 'cost_class', 'expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_rate_limit_leases_user_class', table_name='rate_limit_leases')
+    op.drop_table('rate_limit_leases')
+    op.drop_table('rate_limit_buckets')
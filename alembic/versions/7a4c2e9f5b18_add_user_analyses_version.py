@@ -0,0 +1,28 @@
+"""add user analyses version
+
+Revision ID: 7a4c2e9f5b18
+Revises: 2e7a9b4c1f63
+Create Date: 2026-10-19 21:12:37.504318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a4c2e9f5b18'
+down_revision: Union[str, Sequence[str], None] = '2e7a9b4c1f63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('analyses_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'analyses_version')
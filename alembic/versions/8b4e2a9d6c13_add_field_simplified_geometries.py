@@ -0,0 +1,41 @@
+"""add simplified field geometries
+
+Revision ID: 8b4e2a9d6c13
+Revises: 3c8d1f0a7b52
+Create Date: 2026-10-19 13:05:27.514930
+
+"""
+from typing import Sequence, Union
+import geoalchemy2
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b4e2a9d6c13'
+down_revision: Union[str, Sequence[str], None] = '3c8d1f0a7b52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('fields', sa.Column('geometry_medium', geoalchemy2.types.Geometry(geometry_type='POLYGON', srid=4326, spatial_index=False, from_text='ST_GeomFromEWKT', name='geometry'), nullable=True))
+    op.add_column('fields', sa.Column('geometry_low', geoalchemy2.types.Geometry(geometry_type='POLYGON', srid=4326, spatial_index=False, from_text='ST_GeomFromEWKT', name='geometry'), nullable=True))
+
+    # Tolerances match app.services.field_geometry.SIMPLIFY_TOLERANCES
+    op.execute("""
+        UPDATE fields
+        SET geometry_medium = ST_SimplifyPreserveTopology(geometry, 0.00001),
+            geometry_low = ST_SimplifyPreserveTopology(geometry, 0.0001)
+    """)
+
+    op.alter_column('fields', 'geometry_medium', nullable=False)
+    op.alter_column('fields', 'geometry_low', nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('fields', 'geometry_low')
+    op.drop_column('fields', 'geometry_medium')
@@ -0,0 +1,37 @@
+"""add field user geometry index
+
+Revision ID: 9c3f6a1e2d84
+Revises: 5d1e8c3a9f27
+Create Date: 2026-10-19 19:27:45.106382
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c3f6a1e2d84'
+down_revision: Union[str, Sequence[str], None] = '5d1e8c3a9f27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # GiST over (user_id, geometry) needs btree_gist for the integer column
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.create_index(
+        'ix_fields_user_id_geometry', 'fields', ['user_id', 'geometry'],
+        unique=False, postgresql_using='gist',
+        postgresql_where=sa.text('deleted_at IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        'ix_fields_user_id_geometry', table_name='fields',
+        postgresql_using='gist', postgresql_where=sa.text('deleted_at IS NULL'),
+    )
@@ -0,0 +1,98 @@
+"""partition field_analysis by year
+
+Revision ID: a91d6e2c4b38
+Revises: f4c8a1d3b927
+Create Date: 2026-10-19 15:41:09.503216
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a91d6e2c4b38'
+down_revision: Union[str, Sequence[str], None] = 'f4c8a1d3b927'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _create_partition(year):
+    op.execute(f"""
+        CREATE TABLE IF NOT EXISTS field_analysis_y{year}
+        PARTITION OF field_analysis
+        FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')
+    """)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.rename_table('field_analysis', 'field_analysis_legacy')
+    op.execute("ALTER INDEX field_analysis_pkey RENAME TO field_analysis_legacy_pkey")
+    op.execute("ALTER SEQUENCE field_analysis_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE field_analysis_legacy ALTER COLUMN id DROP DEFAULT")
+    op.execute("ALTER SEQUENCE field_analysis_id_seq AS bigint")
+
+    op.execute("""
+        CREATE TABLE field_analysis (
+            id BIGINT NOT NULL DEFAULT nextval('field_analysis_id_seq'),
+            field_id INTEGER NOT NULL REFERENCES fields (id) ON DELETE CASCADE,
+            ndvi_mean DOUBLE PRECISION NOT NULL,
+            scene_date TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE,
+            PRIMARY KEY (id, scene_date)
+        ) PARTITION BY RANGE (scene_date)
+    """)
+    op.create_index('ux_field_analysis_field_id_scene_date', 'field_analysis', ['field_id', 'scene_date'], unique=True)
+    op.create_index('ix_field_analysis_scene_date_brin', 'field_analysis', ['scene_date'], unique=False, postgresql_using='brin')
+
+    # One partition per year with data, through next year
+    first_year = op.get_bind().execute(sa.text(
+        "SELECT min(extract(year FROM scene_date))::int FROM field_analysis_legacy"
+    )).scalar()
+    last_year = date.today().year + 1
+    for year in range(min(first_year or last_year, last_year - 1), last_year + 1):
+        _create_partition(year)
+
+    # Keep the earliest row of any duplicated (field, scene date) pair
+    op.execute("""
+        INSERT INTO field_analysis (id, field_id, ndvi_mean, scene_date, created_at)
+        SELECT id, field_id, ndvi_mean, scene_date, created_at
+        FROM field_analysis_legacy
+        WHERE field_id IS NOT NULL
+        ORDER BY id
+        ON CONFLICT (field_id, scene_date) DO NOTHING
+    """)
+
+    op.drop_table('field_analysis_legacy')
+    op.execute("ALTER SEQUENCE field_analysis_id_seq OWNED BY field_analysis.id")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER SEQUENCE field_analysis_id_seq OWNED BY NONE")
+    op.rename_table('field_analysis', 'field_analysis_partitioned')
+    op.execute("ALTER INDEX field_analysis_pkey RENAME TO field_analysis_partitioned_pkey")
+
+    op.create_table('field_analysis',
+    sa.Column('id', sa.Integer(), server_default=sa.text("nextval('field_analysis_id_seq')"), nullable=False),
+    sa.Column('field_id', sa.Integer(), nullable=True),
+    sa.Column('ndvi_mean', sa.Float(), nullable=False),
+    sa.Column('scene_date', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['field_id'], ['fields.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_field_analysis_id'), 'field_analysis', ['id'], unique=False)
+
+    op.execute("""
+        INSERT INTO field_analysis (id, field_id, ndvi_mean, scene_date, created_at)
+        SELECT id, field_id, ndvi_mean, scene_date, created_at
+        FROM field_analysis_partitioned
+    """)
+
+    op.drop_table('field_analysis_partitioned')
+    op.execute("ALTER SEQUENCE field_analysis_id_seq AS integer")
+    op.execute("ALTER SEQUENCE field_analysis_id_seq OWNED BY field_analysis.id")
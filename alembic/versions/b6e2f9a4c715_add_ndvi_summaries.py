@@ -0,0 +1,102 @@
+"""add ndvi summaries
+
+Revision ID: b6e2f9a4c715
+Revises: a91d6e2c4b38
+Create Date: 2026-10-19 16:10:52.871264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e2f9a4c715'
+down_revision: Union[str, Sequence[str], None] = 'a91d6e2c4b38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _aggregate_columns():
+    return [
+        sa.Column('month', sa.Date(), nullable=False),
+        sa.Column('analysis_count', sa.Integer(), nullable=False),
+        sa.Column('area_hectares', sa.Float(), nullable=False),
+        sa.Column('ndvi_area_sum', sa.Float(), nullable=False),
+        sa.Column('poor_count', sa.Integer(), nullable=False),
+        sa.Column('moderate_count', sa.Integer(), nullable=False),
+        sa.Column('healthy_count', sa.Integer(), nullable=False),
+        sa.Column('poor_hectares', sa.Float(), nullable=False),
+        sa.Column('moderate_hectares', sa.Float(), nullable=False),
+        sa.Column('healthy_hectares', sa.Float(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    ]
+
+
+# Each live field's latest analysis per month, as app.services.ndvi_summary
+# folds them
+LATEST_IN_MONTH_SQL = """
+    SELECT DISTINCT ON (a.field_id, date_trunc('month', a.scene_date))
+        a.field_id, a.ndvi_mean, date_trunc('month', a.scene_date)::date AS month
+    FROM field_analysis a
+    ORDER BY a.field_id, date_trunc('month', a.scene_date), a.scene_date DESC
+"""
+
+# Thresholds match app.services.ndvi_engine.ndvi_status_from_value
+AGGREGATES_SQL = """
+    a.month,
+    count(*) AS analysis_count,
+    sum(f.area_hectares) AS area_hectares,
+    sum(a.ndvi_mean * f.area_hectares) AS ndvi_area_sum,
+    count(*) FILTER (WHERE a.ndvi_mean < 0.2) AS poor_count,
+    count(*) FILTER (WHERE a.ndvi_mean >= 0.2 AND a.ndvi_mean < 0.5) AS moderate_count,
+    count(*) FILTER (WHERE a.ndvi_mean >= 0.5) AS healthy_count,
+    coalesce(sum(f.area_hectares) FILTER (WHERE a.ndvi_mean < 0.2), 0) AS poor_hectares,
+    coalesce(sum(f.area_hectares) FILTER (WHERE a.ndvi_mean >= 0.2 AND a.ndvi_mean < 0.5), 0) AS moderate_hectares,
+    coalesce(sum(f.area_hectares) FILTER (WHERE a.ndvi_mean >= 0.5), 0) AS healthy_hectares
+"""
+
+AGGREGATE_NAMES = """
+    month, analysis_count, area_hectares, ndvi_area_sum,
+    poor_count, moderate_count, healthy_count,
+    poor_hectares, moderate_hectares, healthy_hectares
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('user_ndvi_summaries',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    *_aggregate_columns(),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'month')
+    )
+    op.create_table('region_ndvi_summaries',
+    sa.Column('cell_lon', sa.Integer(), nullable=False),
+    sa.Column('cell_lat', sa.Integer(), nullable=False),
+    *_aggregate_columns(),
+    sa.PrimaryKeyConstraint('cell_lon', 'cell_lat', 'month')
+    )
+
+    # Backfill from the analyses stored so far
+    op.execute(f"""
+        INSERT INTO user_ndvi_summaries (user_id, {AGGREGATE_NAMES})
+        SELECT f.user_id, {AGGREGATES_SQL}
+        FROM ({LATEST_IN_MONTH_SQL}) a
+        JOIN fields f ON f.id = a.field_id AND f.deleted_at IS NULL
+        GROUP BY f.user_id, a.month
+    """)
+    op.execute(f"""
+        INSERT INTO region_ndvi_summaries (cell_lon, cell_lat, {AGGREGATE_NAMES})
+        SELECT floor(ST_X(f.centroid))::int, floor(ST_Y(f.centroid))::int, {AGGREGATES_SQL}
+        FROM ({LATEST_IN_MONTH_SQL}) a
+        JOIN fields f ON f.id = a.field_id AND f.deleted_at IS NULL
+        GROUP BY floor(ST_X(f.centroid)), floor(ST_Y(f.centroid)), a.month
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('region_ndvi_summaries')
+    op.drop_table('user_ndvi_summaries')
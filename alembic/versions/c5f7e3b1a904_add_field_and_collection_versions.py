@@ -0,0 +1,30 @@
+"""add field and collection versions
+
+Revision ID: c5f7e3b1a904
+Revises: 8b4e2a9d6c13
+Create Date: 2026-10-19 13:41:02.887145
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5f7e3b1a904'
+down_revision: Union[str, Sequence[str], None] = '8b4e2a9d6c13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('fields', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('users', sa.Column('fields_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'fields_version')
+    op.drop_column('fields', 'version')
@@ -0,0 +1,46 @@
+"""add field change tracking
+
+Revision ID: d2a9c4e6f871
+Revises: c5f7e3b1a904
+Create Date: 2026-10-19 14:10:53.201447
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a9c4e6f871'
+down_revision: Union[str, Sequence[str], None] = 'c5f7e3b1a904'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(sa.schema.CreateSequence(sa.Sequence('fields_version_seq')))
+
+    # Per-field counters become draws from the global sequence
+    op.alter_column('fields', 'version', server_default=None)
+    op.alter_column('fields', 'version', type_=sa.BigInteger(), existing_nullable=False)
+    op.execute("UPDATE fields SET version = nextval('fields_version_seq')")
+    op.alter_column('fields', 'version', server_default=sa.text("nextval('fields_version_seq')"))
+
+    op.add_column('fields', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+    op.add_column('fields', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index('ix_fields_user_id_version', 'fields', ['user_id', 'version'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_fields_user_id_version', table_name='fields')
+    op.execute("DELETE FROM fields WHERE deleted_at IS NOT NULL")
+    op.drop_column('fields', 'deleted_at')
+    op.drop_column('fields', 'updated_at')
+    op.alter_column('fields', 'version', server_default=None)
+    op.alter_column('fields', 'version', type_=sa.Integer(), existing_nullable=False)
+    op.execute("UPDATE fields SET version = 1")
+    op.alter_column('fields', 'version', server_default='1')
+    op.execute(sa.schema.DropSequence(sa.Sequence('fields_version_seq')))
@@ -0,0 +1,60 @@
+"""add field spatial statistics
+
+Revision ID: e7b3d5f2a618
+Revises: d2a9c4e6f871
+Create Date: 2026-10-19 14:36:18.640092
+
+"""
+from typing import Sequence, Union
+import geoalchemy2
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b3d5f2a618'
+down_revision: Union[str, Sequence[str], None] = 'd2a9c4e6f871'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+STAT_COLUMNS = (
+    'bbox_west', 'bbox_south', 'bbox_east', 'bbox_north',
+    'perimeter_m', 'vertex_count', 'centroid',
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('fields', sa.Column('bbox_west', sa.Float(), nullable=True))
+    op.add_column('fields', sa.Column('bbox_south', sa.Float(), nullable=True))
+    op.add_column('fields', sa.Column('bbox_east', sa.Float(), nullable=True))
+    op.add_column('fields', sa.Column('bbox_north', sa.Float(), nullable=True))
+    op.add_column('fields', sa.Column('perimeter_m', sa.Float(), nullable=True))
+    op.add_column('fields', sa.Column('vertex_count', sa.Integer(), nullable=True))
+    op.add_column('fields', sa.Column('centroid', geoalchemy2.types.Geometry(geometry_type='POINT', srid=4326, spatial_index=False, from_text='ST_GeomFromEWKT', name='geometry'), nullable=True))
+
+    op.execute("""
+        UPDATE fields
+        SET bbox_west = ST_XMin(geometry),
+            bbox_south = ST_YMin(geometry),
+            bbox_east = ST_XMax(geometry),
+            bbox_north = ST_YMax(geometry),
+            perimeter_m = round(ST_Perimeter(geometry::geography)::numeric, 2),
+            vertex_count = ST_NPoints(geometry),
+            centroid = ST_Centroid(geometry)
+    """)
+
+    for column in STAT_COLUMNS:
+        op.alter_column('fields', column, nullable=False)
+
+    op.create_index('ix_fields_bbox', 'fields', ['bbox_west', 'bbox_south', 'bbox_east', 'bbox_north'], unique=False)
+    op.create_index('idx_fields_centroid', 'fields', ['centroid'], unique=False, postgresql_using='gist')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_fields_centroid', table_name='fields', postgresql_using='gist')
+    op.drop_index('ix_fields_bbox', table_name='fields')
+    for column in reversed(STAT_COLUMNS):
+        op.drop_column('fields', column)
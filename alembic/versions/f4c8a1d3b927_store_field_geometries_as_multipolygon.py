@@ -0,0 +1,40 @@
+"""store field geometries as multipolygon
+
+Revision ID: f4c8a1d3b927
+Revises: e7b3d5f2a618
+Create Date: 2026-10-19 15:02:44.218377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4c8a1d3b927'
+down_revision: Union[str, Sequence[str], None] = 'e7b3d5f2a618'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+GEOMETRY_COLUMNS = ('geometry', 'geometry_medium', 'geometry_low')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for column in GEOMETRY_COLUMNS:
+        op.execute(f"""
+            ALTER TABLE fields
+            ALTER COLUMN {column} TYPE geometry(MULTIPOLYGON, 4326)
+            USING ST_Multi({column})
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Lossy: only the first part of a multi-part field survives
+    for column in GEOMETRY_COLUMNS:
+        op.execute(f"""
+            ALTER TABLE fields
+            ALTER COLUMN {column} TYPE geometry(POLYGON, 4326)
+            USING ST_GeometryN({column}, 1)
+        """)
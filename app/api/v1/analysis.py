@@ -0,0 +1,394 @@
+import logging
+import math
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from geoalchemy2.shape import to_shape
+from shapely.geometry import box, shape
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1 import auth
+from app.core.singleflight import SingleFlight
+from app.db.session import SessionLocal, get_async_db
+from app.models.field import Field
+from app.models.field_analysis import FieldAnalysis
+from app.services.field_groups import get_user_group, group_fields_query
+from app.models.user import User
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Named quality levels, as analysis resolutions in metres
+QUALITY_RESOLUTIONS = {
+    "full": 10,
+    "high": 20,
+    "medium": 40,
+    "preview": 80,
+}
+NATIVE_RESOLUTION = QUALITY_RESOLUTIONS["full"]
+
+# Indices computed by the analyze endpoint, part of the single-flight key
+ANALYSIS_INDICES = ("ndvi",)
+
+# Concurrent identical requests (double clicks, several dashboard tabs)
+# share one STAC search per bbox and one raster read per field and scene
+scene_searches = SingleFlight("stac_search")
+field_analyses = SingleFlight("field_ndvi")
+
+
+def load_satellite_stack():
+    """
+    Import the rasterio/GDAL based satellite modules. Deferred so processes
+    that never analyze (auth, listings, exports) don't pay for GDAL at startup.
+    """
+    from app.services.satellite import ndvi_processor, sentinel_loader
+
+    return sentinel_loader, ndvi_processor
+
+
+def resolve_resolution(quality, resolution):
+    if resolution is not None:
+        if resolution not in QUALITY_RESOLUTIONS.values():
+            raise HTTPException(
+                status_code=400,
+                detail="resolution must be one of "
+                + ", ".join(str(r) for r in QUALITY_RESOLUTIONS.values()),
+            )
+        return resolution
+
+    if quality not in QUALITY_RESOLUTIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"quality must be one of {', '.join(QUALITY_RESOLUTIONS)}",
+        )
+
+    return QUALITY_RESOLUTIONS[quality]
+
+
+def scene_covers(scene, geometry):
+    """
+    Whether `scene`'s footprint contains the whole stored field `geometry`.
+    Only such results may be stored: a stored value is final for its scene
+    date, so a partial mean would keep the complete one from the adjacent
+    tile out.
+    """
+    return shape(scene["geometry"]).covers(to_shape(geometry))
+
+
+def store_analyses(scene, results):
+    """
+    Store full resolution {field_id: ndvi_mean} results of `scene`, for
+    fields its footprint covers (see scene_covers).
+    """
+    from app.services.ndvi_summary import record_analyses
+
+    sentinel_loader, _ = load_satellite_stack()
+    scene_date = sentinel_loader.parse_scene_date(scene["date"])
+
+    rows = [
+        {
+            "field_id": field_id,
+            "ndvi_mean": ndvi_mean,
+            "scene_date": scene_date,
+            "created_at": datetime.utcnow(),
+        }
+        for field_id, ndvi_mean in results.items()
+        if ndvi_mean is not None and not math.isnan(ndvi_mean)
+    ]
+    if not rows:
+        return
+
+    db = SessionLocal()
+    try:
+        record_analyses(db, rows)
+        db.commit()
+    finally:
+        db.close()
+
+
+def refine_field_ndvi(scene, field_id, geometry):
+    """
+    Background follow-up to a quick-look analysis: compute the field at full
+    resolution and store it, where GET /fields/{id}/analyses picks it up.
+    """
+    _, ndvi_processor = load_satellite_stack()
+
+    if not scene_covers(scene, geometry):
+        logger.info(
+            "Field %s is only partly inside scene %s, not storing a refined value",
+            field_id, scene["id"],
+        )
+        return
+
+    try:
+        ndvi_mean = ndvi_processor.compute_ndvi(
+            scene["red"], scene["nir"], field_id, geometry
+        )
+    except ValueError:
+        logger.warning("Field %s lies outside scene %s", field_id, scene["id"])
+        return
+
+    store_analyses(scene, {field_id: ndvi_mean})
+
+
+# =========================
+# ANALYZE FIELD (NDVI)
+# =========================
+@router.post(
+    "/fields/{field_id}/analyze", dependencies=[Depends(auth.rate_limit("analyze"))]
+)
+async def analyze_field_ndvi(
+    field_id: int,
+    background_tasks: BackgroundTasks,
+    quality: str = "full",
+    resolution: Optional[int] = None,
+    refine: bool = False,
+    stats: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(auth.get_current_user),
+):
+    """
+    Mean NDVI of the field in the latest scene. A coarser `quality` or
+    `resolution` (metres) reads the COG overviews for an approximate value
+    within a fraction of the time; with `refine` the full resolution value
+    is computed after the response and stored in the field's analyses.
+    With `stats` the pixel distribution (std, min/max, p10/p50/p90) is
+    returned as well, streamed block by block however large the field.
+    """
+    resolution = resolve_resolution(quality, resolution)
+
+    field = await db.scalar(select(Field).where(
+        Field.id == field_id,
+        Field.user_id == current_user.id,
+        Field.deleted_at.is_(None),
+    ))
+
+    if not field:
+        raise HTTPException(status_code=404, detail="Field not found")
+
+    # STAC search and raster reads are blocking; run them off the event loop
+    sentinel_loader, ndvi_processor = await run_in_threadpool(load_satellite_stack)
+    bbox = field.bbox
+    scene = await scene_searches.run(
+        tuple(bbox), run_in_threadpool, sentinel_loader.search_latest_scene, bbox
+    )
+
+    if not scene:
+        raise HTTPException(status_code=404, detail="No satellite image found")
+
+    # The exact value may already be stored by the refresh job or a refine
+    stored = await db.scalar(select(FieldAnalysis.ndvi_mean).where(
+        FieldAnalysis.field_id == field.id,
+        FieldAnalysis.scene_date == sentinel_loader.parse_scene_date(scene["date"]),
+    ))
+
+    # Only the mean is stored; the distribution needs the pixels again
+    if stored is not None and not stats:
+        return {
+            "field_id": field.id,
+            "scene_date": scene["date"],
+            "ndvi_mean": stored,
+            "resolution_m": NATIVE_RESOLUTION,
+            "approximate": False,
+            "refine": None,
+            "stats": None,
+        }
+
+    approximate = resolution > NATIVE_RESOLUTION
+
+    # field.version changes with every edit, so a reshaped field never
+    # joins a computation for its old geometry
+    key = (field.id, field.version, scene["id"], ANALYSIS_INDICES, resolution)
+    field_stats = None
+    if stats:
+        field_stats = await field_analyses.run(
+            (*key, "stats"),
+            run_in_threadpool,
+            ndvi_processor.compute_ndvi_stats,
+            scene["red"],
+            scene["nir"],
+            field.id,
+            field.geometry,
+            resolution if approximate else None,
+        )
+        ndvi_value = field_stats["mean"]
+    else:
+        ndvi_value = await field_analyses.run(
+            key,
+            run_in_threadpool,
+            ndvi_processor.compute_ndvi,
+            scene["red"],
+            scene["nir"],
+            field.id,
+            field.geometry,
+            resolution if approximate else None,
+        )
+
+    refine_status = None
+    if approximate and refine:
+        background_tasks.add_task(refine_field_ndvi, scene, field.id, field.geometry)
+        refine_status = "scheduled"
+
+    return {
+        "field_id": field.id,
+        "scene_date": scene["date"],
+        "ndvi_mean": ndvi_value,
+        "resolution_m": resolution,
+        "approximate": approximate,
+        "refine": refine_status,
+        "stats": field_stats,
+    }
+
+
+# =========================
+# ANALYZE GROUP (NDVI)
+# =========================
+async def _analyze_in_scene(db, scene, members, resolution):
+    """
+    {field_id: result} for the `members` of a group inside `scene`: stored
+    results where there are any, the rest from one batch reading each band
+    once. Members the footprint only partly covers are marked partial and
+    not stored; new full resolution results of the others are. Members
+    outside the raster are left out.
+    """
+    sentinel_loader, ndvi_processor = load_satellite_stack()
+
+    stored = dict((await db.execute(
+        select(FieldAnalysis.field_id, FieldAnalysis.ndvi_mean).where(
+            FieldAnalysis.field_id.in_([m.id for m in members]),
+            FieldAnalysis.scene_date == sentinel_loader.parse_scene_date(scene["date"]),
+        )
+    )).all())
+
+    approximate = resolution > NATIVE_RESOLUTION
+    pending = [m for m in members if m.id not in stored]
+
+    computed = {}
+    if pending:
+        computed = await field_analyses.run(
+            (
+                "group", scene["id"], ANALYSIS_INDICES, resolution,
+                tuple((m.id, m.version) for m in pending),
+            ),
+            run_in_threadpool,
+            ndvi_processor.compute_ndvi_batch,
+            scene["red"],
+            scene["nir"],
+            [(m.id, m.geometry) for m in pending],
+            resolution if approximate else None,
+        )
+
+    partial = {m.id for m in pending if not scene_covers(scene, m.geometry)}
+    if computed and not approximate:
+        await run_in_threadpool(store_analyses, scene, {
+            field_id: ndvi_mean
+            for field_id, ndvi_mean in computed.items()
+            if field_id not in partial
+        })
+
+    results = {}
+    for m in members:
+        if m.id in stored:
+            ndvi_mean, source = stored[m.id], "stored"
+        else:
+            ndvi_mean, source = computed.get(m.id), "computed"
+            if ndvi_mean is None or math.isnan(ndvi_mean):
+                continue
+
+        results[m.id] = {
+            "field_id": m.id,
+            "ndvi_mean": ndvi_mean,
+            "source": source,
+            "scene_date": scene["date"],
+            "partial": m.id in partial,
+        }
+
+    return results
+
+
+async def _search_scene(bbox):
+    sentinel_loader, _ = load_satellite_stack()
+    return await scene_searches.run(
+        tuple(bbox), run_in_threadpool, sentinel_loader.search_latest_scene, bbox
+    )
+
+
+@router.post(
+    "/groups/{group_id}/analyze", dependencies=[Depends(auth.rate_limit("analyze"))]
+)
+async def analyze_group_ndvi(
+    group_id: int,
+    quality: str = "full",
+    resolution: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(auth.get_current_user),
+):
+    """
+    Mean NDVI of every field in the group from the latest scene over the
+    group's cached bbox: one STAC search, one batch reading each band once.
+    Members that scene's tile misses or only partly covers are searched for
+    with their own bbox, like the per-field endpoint does, and batched per
+    scene found. Stored results are reused; new full resolution results are
+    stored unless they are partial (see scene_covers).
+    """
+    resolution = resolve_resolution(quality, resolution)
+    group = await get_user_group(db, current_user.id, group_id)
+
+    members = (await db.execute(group_fields_query(
+        group.id,
+        Field.id,
+        Field.version,
+        Field.geometry,
+        Field.bbox_west,
+        Field.bbox_south,
+        Field.bbox_east,
+        Field.bbox_north,
+    ))).all()
+
+    if not members:
+        raise HTTPException(status_code=404, detail="Group has no fields")
+
+    await run_in_threadpool(load_satellite_stack)
+    scene = await _search_scene(group.bbox)
+
+    if not scene:
+        raise HTTPException(status_code=404, detail="No satellite image found")
+
+    analyzed = await _analyze_in_scene(db, scene, members, resolution)
+
+    # Scenes found for earlier members are reused for later ones inside
+    # their footprint, so this takes about one search per extra tile
+    extra_scenes = {}
+    for m in members:
+        if m.id in analyzed and not analyzed[m.id]["partial"]:
+            continue
+
+        bbox = [m.bbox_west, m.bbox_south, m.bbox_east, m.bbox_north]
+        member_scene = next(
+            (
+                found for found, _ in extra_scenes.values()
+                if shape(found["geometry"]).covers(box(*bbox))
+            ),
+            None,
+        ) or await _search_scene(bbox)
+
+        if member_scene and member_scene["id"] != scene["id"]:
+            extra_scenes.setdefault(member_scene["id"], (member_scene, []))[1].append(m)
+
+    for member_scene, scene_members in extra_scenes.values():
+        found = await _analyze_in_scene(db, member_scene, scene_members, resolution)
+        for field_id, result in found.items():
+            if field_id not in analyzed or not result["partial"]:
+                analyzed[field_id] = result
+
+    return {
+        "group_id": group.id,
+        "scene_date": scene["date"],
+        "resolution_m": resolution,
+        "approximate": resolution > NATIVE_RESOLUTION,
+        "results": [analyzed[m.id] for m in members if m.id in analyzed],
+        "not_covered": [m.id for m in members if m.id not in analyzed],
+    }
@@ -1,12 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from jose import JWTError, jwt
 
-from app.db.session import get_db
+from app.db.session import get_async_db, read_session
 from app.models.user import User
 from app.core.security import hash_password, verify_password, create_access_token
 from app.core.config import settings  # make sure SECRET_KEY & ALGORITHM exist
+from app.core.metrics import RATE_LIMIT_REJECTIONS
+from app.core.rate_limit import COST_CLASSES, RateLimited, get_rate_limiter
 
 router = APIRouter()
 
@@ -18,19 +22,19 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/login")
 # REGISTER
 # =========================
 @router.post("/register")
-def register(email: str, password: str, db: Session = Depends(get_db)):
-    existing = db.query(User).filter(User.email == email).first()
+async def register(email: str, password: str, db: AsyncSession = Depends(get_async_db)):
+    existing = await db.scalar(select(User).where(User.email == email))
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
 
+    # bcrypt is deliberately slow; keep it off the event loop
     user = User(
         email=email,
-        hashed_password=hash_password(password),
+        hashed_password=await run_in_threadpool(hash_password, password),
     )
 
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
 
     return {"message": "User created"}
 
@@ -39,10 +43,12 @@ def register(email: str, password: str, db: Session = Depends(get_db)):
 # LOGIN
 # =========================
 @router.post("/login")
-def login(email: str, password: str, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == email).first()
+async def login(email: str, password: str, db: AsyncSession = Depends(get_async_db)):
+    user = await db.scalar(select(User).where(User.email == email))
 
-    if not user or not verify_password(password, user.hashed_password):
+    if not user or not await run_in_threadpool(
+        verify_password, password, user.hashed_password
+    ):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     # IMPORTANT: store user.id as string
@@ -54,9 +60,9 @@ def login(email: str, password: str, db: Session = Depends(get_db)):
 # =========================
 # GET CURRENT USER
 # =========================
-def get_current_user(
+async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -78,10 +84,62 @@ def get_current_user(
     except JWTError:
         raise credentials_exception
 
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user = await db.get(User, int(user_id))
 
     if user is None:
         raise credentials_exception
 
     return user
 
+
+# =========================
+# READ SESSION
+# =========================
+async def get_read_db(current_user: User = Depends(get_current_user)):
+    """Replica session for read-only routes, with read-your-writes."""
+    async with read_session(current_user.id, current_user.fields_version) as db:
+        yield db
+
+
+async def get_analyses_read_db(current_user: User = Depends(get_current_user)):
+    """get_read_db for routes reading stored analyses or NDVI summaries."""
+    async with read_session(
+        current_user.id, current_user.fields_version, current_user.analyses_version
+    ) as db:
+        yield db
+
+
+# =========================
+# RATE LIMITS
+# =========================
+def rate_limit(cost_class):
+    """
+    Route dependency charging the current user's `cost_class` bucket and
+    holding one of its in-flight slots until the response is produced.
+    """
+    if cost_class not in COST_CLASSES:
+        raise ValueError(f"cost_class must be one of {', '.join(COST_CLASSES)}")
+
+    async def dependency(current_user: User = Depends(get_current_user)):
+        if not settings.RATE_LIMIT_ENABLED:
+            yield
+            return
+
+        limiter = get_rate_limiter()
+        try:
+            lease = await limiter.acquire(current_user.id, cost_class)
+        except RateLimited as exc:
+            RATE_LIMIT_REJECTIONS.labels(cost_class=cost_class, reason=exc.reason).inc()
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests" if exc.reason == "rate"
+                else "Too many concurrent requests",
+                headers={"Retry-After": str(exc.retry_after)},
+            )
+
+        try:
+            yield
+        finally:
+            await limiter.release(lease)
+
+    return dependency
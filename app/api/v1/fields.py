@@ -1,84 +1,150 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select, text
 from geoalchemy2.shape import from_shape, to_shape
 from shapely.geometry import shape, mapping
+import shapely
 
 import io
+import sys
 import zipfile
-import shapefile
+from datetime import datetime
+from typing import Optional
 
-from app.db.session import get_db
-from app.models.field import Field
+from app.core.http_cache import etag_matches, make_etag, not_modified, set_etag
+from app.db.session import get_async_db
+from app.models.field import Field, FIELDS_VERSION_SEQ
+from app.models.field_analysis import FieldAnalysis
 from app.models.user import User
-from app.schemas.field import FieldCreate
+from app.schemas.field import FieldCreate, FieldImport
 from app.services.ndvi_engine import calculate_ndvi_status
+from app.core.config import settings
+from app.services.field_groups import refresh_field_groups
+from app.services.field_versions import bump_fields_version
+from app.services.ndvi_summary import contribute_fields, withdraw_fields
+from app.services.field_overlap import (
+    find_import_overlaps,
+    find_overlaps,
+    find_overlaps_within,
+    import_conflict,
+    overlap_conflict,
+)
+from app.services.field_geometry import (
+    GEOMETRY_COLUMNS,
+    geometry_to_geojson,
+    resolve_simplify_level,
+    simplified_geometries,
+    validate_field_geometry,
+)
 from app.api.v1 import auth
 
-from app.services.satellite.sentinel_loader import search_latest_scene
-from app.services.satellite.ndvi_processor import compute_ndvi
-
 router = APIRouter()
 
 
+def invalidate_geometry_cache(field_id):
+    # The cache lives in the satellite stack; if this process never imported
+    # it there is nothing to invalidate, and no reason to load GDAL for it
+    module = sys.modules.get("app.services.satellite.geometry_cache")
+    if module is not None:
+        module.geometry_cache.invalidate(field_id)
+
 
 # =========================
-# CRS VALIDATION HELPER
+# DERIVED GEOMETRY COLUMNS
 # =========================
-def validate_geometry_crs(geom_shape):
-    if geom_shape.geom_type != "Polygon":
-        raise HTTPException(
-            status_code=400,
-            detail="Only Polygon geometries are supported"
-        )
+async def geometry_columns(db, geom_shape):
+    """
+    Everything stored alongside a field's geometry, computed once at write
+    time so readers never have to decode the geometry for it.
+    """
+    # Accurate PostGIS area and perimeter calculation
+    geog = func.ST_GeogFromText(geom_shape.wkt)
+    area_m2, perimeter_m = (await db.execute(select(
+        func.ST_Area(geog),
+        func.ST_Perimeter(geog),
+    ))).one()
+
+    return _derived_columns(geom_shape, area_m2, perimeter_m)
+
+
+GEOGRAPHY_MEASURES_SQL = text("""
+    SELECT ST_Area(g.geog), ST_Perimeter(g.geog)
+    FROM unnest(CAST(:wkts AS text[])) WITH ORDINALITY AS upload(wkt, idx)
+    CROSS JOIN LATERAL (SELECT ST_GeogFromText(upload.wkt) AS geog) AS g
+    ORDER BY upload.idx
+""")
+
+
+async def geometry_columns_many(db, shapes):
+    """geometry_columns for many shapes, with one round trip for all areas."""
+    measures = (await db.execute(
+        GEOGRAPHY_MEASURES_SQL, {"wkts": [geom.wkt for geom in shapes]}
+    )).all()
+
+    return [
+        _derived_columns(geom_shape, area_m2, perimeter_m)
+        for geom_shape, (area_m2, perimeter_m) in zip(shapes, measures)
+    ]
+
+
+def _derived_columns(geom_shape, area_m2, perimeter_m):
+    if area_m2 is None:
+        raise HTTPException(status_code=400, detail="Failed to calculate area")
 
-    for x, y in geom_shape.exterior.coords:
-        if not (-180 <= x <= 180 and -90 <= y <= 90):
-            raise HTTPException(
-                status_code=400,
-                detail="Coordinates must be in WGS84 (EPSG:4326)"
-            )
+    area_ha = area_m2 / 10000
+    simplified = simplified_geometries(geom_shape)
+    west, south, east, north = geom_shape.bounds
 
+    return {
+        "area_hectares": round(area_ha, 2),
+        "ndvi_status": calculate_ndvi_status(area_ha),
+        "geometry": from_shape(geom_shape, srid=4326),
+        "geometry_medium": from_shape(simplified["medium"], srid=4326),
+        "geometry_low": from_shape(simplified["low"], srid=4326),
+        "bbox_west": west,
+        "bbox_south": south,
+        "bbox_east": east,
+        "bbox_north": north,
+        "centroid": from_shape(geom_shape.centroid, srid=4326),
+        "perimeter_m": round(perimeter_m, 2),
+        "vertex_count": shapely.get_num_coordinates(geom_shape),
+    }
 
 
 # =========================
 # CREATE FIELD (POST)
 # =========================
 @router.post("/fields")
-def create_field(
+async def create_field(
     payload: FieldCreate,
-    db: Session = Depends(get_db),
+    allow_overlap: bool = False,
+    db: AsyncSession = Depends(get_async_db),
    current_user: User = Depends(auth.get_current_user)
 ):
     try:
         geom_shape = shape(payload.geometry)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid GeoJSON geometry")
-    
-    validate_geometry_crs(geom_shape)
-    # Accurate PostGIS area calculation
-    wkt = geom_shape.wkt
-    area_m2 = db.query(
-        func.ST_Area(func.ST_GeogFromText(wkt))
-    ).scalar()
 
-    if area_m2 is None:
-        raise HTTPException(status_code=400, detail="Failed to calculate area")
+    geom_shape = validate_field_geometry(geom_shape)
 
-    area_ha = area_m2 / 10000
-    ndvi = calculate_ndvi_status(area_ha)
+    # Taken first: the user row lock also serializes concurrent overlap checks
+    await bump_fields_version(db, current_user.id)
+
+    if not allow_overlap:
+        overlaps = await find_overlaps(db, current_user.id, geom_shape)
+        if overlaps:
+            raise overlap_conflict(overlaps)
 
     field = Field(
-        area_hectares=round(area_ha, 2),
-        ndvi_status=ndvi,
-        geometry=from_shape(geom_shape, srid=4326),
+        **await geometry_columns(db, geom_shape),
         user_id=current_user.id,
     )
 
     db.add(field)
-    db.commit()
-    db.refresh(field)
+    await db.commit()
+    await db.refresh(field)
 
     return {
         "message": "Field saved",
@@ -88,64 +154,226 @@ def create_field(
     }
 
 
+# =========================
+# IMPORT FIELDS (POST)
+# =========================
+@router.post("/fields/import", dependencies=[Depends(auth.rate_limit("bulk"))])
+async def import_fields(
+    payload: FieldImport,
+    allow_overlap: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(auth.get_current_user)
+):
+    """
+    Create every feature of a GeoJSON FeatureCollection in one transaction.
+    Unless `allow_overlap`, nothing is stored if features overlap each other
+    or the user's existing fields; the 409 lists the offending features.
+    """
+    if not payload.features:
+        raise HTTPException(status_code=400, detail="No features to import")
+
+    if len(payload.features) > settings.FIELD_IMPORT_MAX_FEATURES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.FIELD_IMPORT_MAX_FEATURES} features per import",
+        )
+
+    shapes = []
+    for index, feature in enumerate(payload.features):
+        try:
+            geom_shape = shape(feature.geometry)
+        except Exception:
+            raise HTTPException(
+                status_code=400, detail=f"Invalid GeoJSON geometry in feature {index}"
+            )
+        shapes.append(validate_field_geometry(geom_shape))
+
+    await bump_fields_version(db, current_user.id)
+
+    if not allow_overlap:
+        within = find_overlaps_within(shapes)
+        existing = await find_import_overlaps(db, current_user.id, shapes)
+        if within or existing:
+            raise import_conflict(within, existing)
+
+    fields = [
+        Field(**columns, user_id=current_user.id)
+        for columns in await geometry_columns_many(db, shapes)
+    ]
+
+    db.add_all(fields)
+    await db.commit()
+
+    return {
+        "message": "Fields imported",
+        "ids": [field.id for field in fields],
+    }
+
+
 # =========================
 # LIST FIELDS (GET)
 # =========================
-@router.get("/fields")
-def list_fields(
+@router.get("/fields", dependencies=[Depends(auth.rate_limit("read"))])
+async def list_fields(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 10,
-    db: Session = Depends(get_db),
+    simplify: str = "full",
+    zoom: Optional[int] = None,
+    precision: Optional[int] = None,
+    include_geometry: bool = True,
+    db: AsyncSession = Depends(auth.get_read_db),
     current_user: User = Depends(auth.get_current_user)
 ):
     # Prevent abuse
     limit = min(limit, 100)
+    level = resolve_simplify_level(simplify, zoom)
 
-    fields = (
-        db.query(Field)
-        .filter(Field.user_id == current_user.id)
+    # The user's collection version changes with any field write, so a match
+    # means nothing on this page changed and no geometry is touched
+    etag = make_etag(
+        "fields", current_user.id, current_user.fields_version,
+        skip, limit, level, precision, include_geometry,
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    # Only the requested geometry level is fetched and decoded; overview
+    # listings skip geometries and rely on the precomputed bbox and centroid
+    columns = [
+        Field.id,
+        Field.area_hectares,
+        Field.ndvi_status,
+        Field.bbox_west,
+        Field.bbox_south,
+        Field.bbox_east,
+        Field.bbox_north,
+        func.ST_X(Field.centroid).label("centroid_lon"),
+        func.ST_Y(Field.centroid).label("centroid_lat"),
+    ]
+    if include_geometry:
+        columns.append(GEOMETRY_COLUMNS[level].label("geometry"))
+
+    fields = (await db.execute(
+        select(*columns)
+        .where(Field.user_id == current_user.id, Field.deleted_at.is_(None))
+        .order_by(Field.id)
         .offset(skip)
         .limit(limit)
-        .all()
-    )
+    )).all()
 
-    total = db.query(Field).filter(
-        Field.user_id == current_user.id
-    ).count()
+    total = await db.scalar(
+        select(func.count())
+        .select_from(Field)
+        .where(Field.user_id == current_user.id, Field.deleted_at.is_(None))
+    )
 
     result = []
     for f in fields:
-        geom = to_shape(f.geometry)
-        result.append({
+        item = {
             "id": f.id,
             "area_hectares": f.area_hectares,
             "ndvi_status": f.ndvi_status,
-            "geometry": mapping(geom),
-        })
+            "bbox": [f.bbox_west, f.bbox_south, f.bbox_east, f.bbox_north],
+            "centroid": [f.centroid_lon, f.centroid_lat],
+        }
+        if include_geometry:
+            item["geometry"] = geometry_to_geojson(to_shape(f.geometry), precision)
+        result.append(item)
 
     return {
         "total": total,
         "skip": skip,
         "limit": limit,
+        "simplify": level,
         "data": result,
     }
 
 
 
+# =========================
+# CHANGE FEED
+# =========================
+@router.get("/fields/changes", dependencies=[Depends(auth.rate_limit("read"))])
+async def list_field_changes(
+    since: int = 0,
+    limit: int = 500,
+    simplify: str = "full",
+    precision: Optional[int] = None,
+    db: AsyncSession = Depends(auth.get_read_db),
+    current_user: User = Depends(auth.get_current_user)
+):
+    """
+    Fields inserted, updated or deleted after cursor `since`, oldest first.
+    Pass the returned `next_cursor` as `since` to continue syncing.
+    """
+    limit = min(limit, 1000)
+    level = resolve_simplify_level(simplify)
+
+    rows = (await db.execute(
+        select(
+            Field.id,
+            Field.version,
+            Field.updated_at,
+            Field.deleted_at,
+            Field.area_hectares,
+            Field.ndvi_status,
+            GEOMETRY_COLUMNS[level].label("geometry"),
+        )
+        .where(Field.user_id == current_user.id, Field.version > since)
+        .order_by(Field.version)
+        .limit(limit + 1)
+    )).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    changes = []
+    for f in rows:
+        if f.deleted_at is not None:
+            changes.append({
+                "id": f.id,
+                "version": f.version,
+                "deleted": True,
+                "updated_at": f.deleted_at,
+            })
+            continue
+
+        changes.append({
+            "id": f.id,
+            "version": f.version,
+            "deleted": False,
+            "updated_at": f.updated_at,
+            "area_hectares": f.area_hectares,
+            "ndvi_status": f.ndvi_status,
+            "geometry": geometry_to_geojson(to_shape(f.geometry), precision),
+        })
+
+    return {
+        "changes": changes,
+        "next_cursor": rows[-1].version if rows else since,
+        "has_more": has_more,
+    }
+
+
 # =========================
 # UPDATE FIELD
 # =========================
 @router.patch("/fields/{field_id}")
-def update_field_geometry(
+async def update_field_geometry(
     field_id: int,
     payload: FieldCreate,
-    db: Session = Depends(get_db),
+    allow_overlap: bool = False,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(auth.get_current_user)
 ):
-    field = db.query(Field).filter(
+    field = await db.scalar(select(Field).where(
         Field.id == field_id,
-        Field.user_id == current_user.id
-    ).first()
+        Field.user_id == current_user.id,
+        Field.deleted_at.is_(None),
+    ))
 
     if not field:
         raise HTTPException(status_code=404, detail="Field not found")
@@ -154,25 +382,32 @@ def update_field_geometry(
         geom_shape = shape(payload.geometry)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid GeoJSON geometry")
-    
-    validate_geometry_crs(geom_shape)
-    wkt = geom_shape.wkt
-    area_m2 = db.query(
-        func.ST_Area(func.ST_GeogFromText(wkt))
-    ).scalar()
 
-    if area_m2 is None:
-        raise HTTPException(status_code=400, detail="Failed to calculate area")
+    geom_shape = validate_field_geometry(geom_shape)
 
-    area_ha = area_m2 / 10000
-    ndvi = calculate_ndvi_status(area_ha)
+    await bump_fields_version(db, current_user.id)
+
+    if not allow_overlap:
+        overlaps = await find_overlaps(
+            db, current_user.id, geom_shape, exclude_field_id=field.id
+        )
+        if overlaps:
+            raise overlap_conflict(overlaps)
 
-    field.geometry = from_shape(geom_shape, srid=4326)
-    field.area_hectares = round(area_ha, 2)
-    field.ndvi_status = ndvi
+    # The field's NDVI summary contributions move with its area and centroid
+    await db.run_sync(withdraw_fields, [field.id])
 
-    db.commit()
-    db.refresh(field)
+    for column, value in (await geometry_columns(db, geom_shape)).items():
+        setattr(field, column, value)
+    field.version = FIELDS_VERSION_SEQ.next_value()
+
+    await db.flush()
+    await db.run_sync(contribute_fields, [field.id])
+    await refresh_field_groups(db, field.id)
+    await db.commit()
+    await db.refresh(field)
+
+    invalidate_geometry_cache(field.id)
 
     return {
         "message": "Field updated",
@@ -185,16 +420,44 @@ def update_field_geometry(
 # =========================
 # EXPORT GEOJSON
 # =========================
-@router.get("/fields/{field_id}/export/geojson")
-def export_field_geojson(
+@router.get(
+    "/fields/{field_id}/export/geojson", dependencies=[Depends(auth.rate_limit("read"))]
+)
+async def export_field_geojson(
     field_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    simplify: str = "full",
+    precision: Optional[int] = None,
+    db: AsyncSession = Depends(auth.get_read_db),
     current_user: User = Depends(auth.get_current_user)
 ):
-    field = db.query(Field).filter(
+    level = resolve_simplify_level(simplify)
+
+    version = await db.scalar(select(Field.version).where(
+        Field.id == field_id,
+        Field.user_id == current_user.id,
+        Field.deleted_at.is_(None),
+    ))
+
+    if version is None:
+        raise HTTPException(status_code=404, detail="Field not found")
+
+    etag = make_etag("geojson", field_id, version, level, precision)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    field = (await db.execute(select(
+        Field.id,
+        Field.area_hectares,
+        Field.ndvi_status,
+        GEOMETRY_COLUMNS[level].label("geometry"),
+    ).where(
         Field.id == field_id,
-        Field.user_id == current_user.id
-    ).first()
+        Field.user_id == current_user.id,
+        Field.deleted_at.is_(None),
+    ))).first()
 
     if not field:
         raise HTTPException(status_code=404, detail="Field not found")
@@ -211,7 +474,7 @@ def export_field_geojson(
                     "area_hectares": field.area_hectares,
                     "ndvi_status": field.ndvi_status,
                 },
-                "geometry": mapping(geom),
+                "geometry": geometry_to_geojson(geom, precision),
             }
         ],
     }
@@ -220,22 +483,46 @@ def export_field_geojson(
 # =========================
 # EXPORT SHAPEFILE
 # =========================
-@router.get("/fields/{field_id}/export/shapefile")
-def export_field_shapefile(
+@router.get(
+    "/fields/{field_id}/export/shapefile", dependencies=[Depends(auth.rate_limit("bulk"))]
+)
+async def export_field_shapefile(
     field_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: AsyncSession = Depends(auth.get_read_db),
     current_user: User = Depends(auth.get_current_user)
 ):
-    field = db.query(Field).filter(
+    version = await db.scalar(select(Field.version).where(
         Field.id == field_id,
-        Field.user_id == current_user.id
-    ).first()
+        Field.user_id == current_user.id,
+        Field.deleted_at.is_(None),
+    ))
+
+    if version is None:
+        raise HTTPException(status_code=404, detail="Field not found")
+
+    etag = make_etag("shapefile", field_id, version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    field = (await db.execute(select(
+        Field.id,
+        Field.area_hectares,
+        Field.ndvi_status,
+        Field.geometry,
+    ).where(
+        Field.id == field_id,
+        Field.user_id == current_user.id,
+        Field.deleted_at.is_(None),
+    ))).first()
 
     if not field:
         raise HTTPException(status_code=404, detail="Field not found")
 
-    geom = to_shape(field.geometry)
-    geojson_geom = mapping(geom)
+    import shapefile
+
+    # Multi-part fields and holes become parts of one shapefile polygon
+    geojson_geom = mapping(to_shape(field.geometry))
 
     shp_io = io.BytesIO()
     shx_io = io.BytesIO()
@@ -268,7 +555,9 @@ def export_field_shapefile(
         zip_buffer,
         media_type="application/zip",
         headers={
-            "Content-Disposition": f"attachment; filename=field-{field_id}.zip"
+            "Content-Disposition": f"attachment; filename=field-{field_id}.zip",
+            "ETag": etag,
+            "Cache-Control": "private, no-cache",
         },
     )
 
@@ -277,21 +566,30 @@ def export_field_shapefile(
 # DELETE FIELD
 # =========================
 @router.delete("/fields/{field_id}")
-def delete_field(
+async def delete_field(
     field_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(auth.get_current_user)
 ):
-    field = db.query(Field).filter(
+    field = await db.scalar(select(Field).where(
         Field.id == field_id,
-        Field.user_id == current_user.id
-    ).first()
+        Field.user_id == current_user.id,
+        Field.deleted_at.is_(None),
+    ))
 
     if not field:
         raise HTTPException(status_code=404, detail="Field not found")
 
-    db.delete(field)
-    db.commit()
+    # Soft delete: the tombstone is what tells syncing clients to drop it
+    await bump_fields_version(db, current_user.id)
+    await db.run_sync(withdraw_fields, [field_id])
+    field.deleted_at = func.now()
+    field.version = FIELDS_VERSION_SEQ.next_value()
+    await db.flush()
+    await refresh_field_groups(db, field_id)
+    await db.commit()
+
+    invalidate_geometry_cache(field_id)
 
     return {
         "message": "Field deleted",
@@ -300,38 +598,49 @@ def delete_field(
 
 
 # =========================
-# ANALYZE FIELD (NDVI)
+# ANALYSIS HISTORY
 # =========================
-@router.post("/fields/{field_id}/analyze")
-def analyze_field_ndvi(
+@router.get(
+    "/fields/{field_id}/analyses", dependencies=[Depends(auth.rate_limit("read"))]
+)
+async def list_field_analyses(
     field_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(auth.get_current_user),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = 366,
+    db: AsyncSession = Depends(auth.get_analyses_read_db),
+    current_user: User = Depends(auth.get_current_user)
 ):
-    field = db.query(Field).filter(
+    """NDVI time series of a field, oldest first, within [start, end)."""
+    limit = min(limit, 1000)
+
+    exists = await db.scalar(select(Field.id).where(
         Field.id == field_id,
-        Field.user_id == current_user.id
-    ).first()
+        Field.user_id == current_user.id,
+        Field.deleted_at.is_(None),
+    ))
 
-    if not field:
+    if exists is None:
         raise HTTPException(status_code=404, detail="Field not found")
 
-    geom = to_shape(field.geometry)
-    bbox = list(geom.bounds)
-
-    scene = search_latest_scene(bbox)
-
-    if not scene:
-        raise HTTPException(status_code=404, detail="No satellite image found")
-
-    ndvi_value = compute_ndvi(
-        scene["red"],
-        scene["nir"],
-        geom
+    # scene_date bounds let Postgres prune to the matching yearly partitions
+    query = select(FieldAnalysis.scene_date, FieldAnalysis.ndvi_mean).where(
+        FieldAnalysis.field_id == field_id
     )
+    if start is not None:
+        query = query.where(FieldAnalysis.scene_date >= start)
+    if end is not None:
+        query = query.where(FieldAnalysis.scene_date < end)
+
+    rows = (await db.execute(
+        query.order_by(FieldAnalysis.scene_date).limit(limit)
+    )).all()
 
     return {
-        "field_id": field.id,
-        "scene_date": scene["date"],
-        "ndvi_mean": ndvi_value,
-    }
\ No newline at end of file
+        "field_id": field_id,
+        "data": [
+            {"scene_date": row.scene_date, "ndvi_mean": row.ndvi_mean}
+            for row in rows
+        ],
+    }
+
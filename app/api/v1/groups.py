@@ -0,0 +1,249 @@
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from geoalchemy2.shape import to_shape
+from sqlalchemy import and_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1 import auth
+from app.db.session import get_async_db, read_session
+from app.models.field import Field
+from app.models.field_group import FieldGroup, FieldGroupMember
+from app.models.user import User
+from app.schemas.field_group import FieldGroupCreate, FieldGroupMembers
+from app.services.field_geometry import (
+    GEOMETRY_COLUMNS,
+    geometry_to_geojson,
+    resolve_simplify_level,
+    validate_precision,
+)
+from app.services.field_groups import (
+    get_user_group,
+    group_fields_query,
+    set_group_members,
+)
+from app.services.field_versions import bump_fields_version
+
+router = APIRouter()
+
+# Rows fetched per round trip while streaming a group export
+EXPORT_BATCH_SIZE = 500
+
+
+def _group_to_dict(group, field_count):
+    return {
+        "id": group.id,
+        "name": group.name,
+        "field_count": field_count,
+        "bbox": group.bbox,
+    }
+
+
+def _validated_name(name):
+    name = name.strip()
+    if not name:
+        raise HTTPException(status_code=400, detail="Group name is required")
+    return name
+
+
+# =========================
+# CREATE GROUP
+# =========================
+@router.post("/groups")
+async def create_group(
+    payload: FieldGroupCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(auth.get_current_user)
+):
+    # Group writes bump the collection version too, so replica reads of the
+    # user's groups wait for them like they wait for field writes
+    await bump_fields_version(db, current_user.id)
+
+    group = FieldGroup(user_id=current_user.id, name=_validated_name(payload.name))
+    db.add(group)
+    await db.flush()
+
+    await set_group_members(db, group, current_user.id, payload.field_ids)
+    await db.commit()
+
+    return {
+        "message": "Group created",
+        **_group_to_dict(group, len(set(payload.field_ids))),
+    }
+
+
+# =========================
+# LIST GROUPS
+# =========================
+@router.get("/groups", dependencies=[Depends(auth.rate_limit("read"))])
+async def list_groups(
+    db: AsyncSession = Depends(auth.get_read_db),
+    current_user: User = Depends(auth.get_current_user)
+):
+    rows = (await db.execute(
+        select(FieldGroup, func.count(Field.id))
+        .outerjoin(FieldGroupMember, FieldGroupMember.group_id == FieldGroup.id)
+        .outerjoin(Field, and_(
+            Field.id == FieldGroupMember.field_id,
+            Field.deleted_at.is_(None),
+        ))
+        .where(FieldGroup.user_id == current_user.id)
+        .group_by(FieldGroup.id)
+        .order_by(FieldGroup.id)
+    )).all()
+
+    return {"data": [_group_to_dict(group, count) for group, count in rows]}
+
+
+# =========================
+# GROUP MEMBERSHIP
+# =========================
+@router.put("/groups/{group_id}/fields")
+async def set_group_fields(
+    group_id: int,
+    payload: FieldGroupMembers,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(auth.get_current_user)
+):
+    """Replace the group's fields with `field_ids`."""
+    await bump_fields_version(db, current_user.id)
+
+    group = await get_user_group(db, current_user.id, group_id)
+    await set_group_members(db, group, current_user.id, payload.field_ids)
+    await db.commit()
+
+    return {
+        "message": "Group updated",
+        **_group_to_dict(group, len(set(payload.field_ids))),
+    }
+
+
+@router.get(
+    "/groups/{group_id}/fields", dependencies=[Depends(auth.rate_limit("read"))]
+)
+async def list_group_fields(
+    group_id: int,
+    simplify: str = "full",
+    zoom: Optional[int] = None,
+    precision: Optional[int] = None,
+    include_geometry: bool = True,
+    db: AsyncSession = Depends(auth.get_read_db),
+    current_user: User = Depends(auth.get_current_user)
+):
+    """Every live field of the group, from one query."""
+    level = resolve_simplify_level(simplify, zoom)
+    group = await get_user_group(db, current_user.id, group_id)
+
+    columns = [
+        Field.id,
+        Field.area_hectares,
+        Field.ndvi_status,
+        Field.bbox_west,
+        Field.bbox_south,
+        Field.bbox_east,
+        Field.bbox_north,
+    ]
+    if include_geometry:
+        columns.append(GEOMETRY_COLUMNS[level].label("geometry"))
+
+    fields = (await db.execute(group_fields_query(group.id, *columns))).all()
+
+    result = []
+    for f in fields:
+        item = {
+            "id": f.id,
+            "area_hectares": f.area_hectares,
+            "ndvi_status": f.ndvi_status,
+            "bbox": [f.bbox_west, f.bbox_south, f.bbox_east, f.bbox_north],
+        }
+        if include_geometry:
+            item["geometry"] = geometry_to_geojson(to_shape(f.geometry), precision)
+        result.append(item)
+
+    return {
+        **_group_to_dict(group, len(result)),
+        "simplify": level,
+        "data": result,
+    }
+
+
+# =========================
+# EXPORT GROUP GEOJSON
+# =========================
+async def _stream_group_geojson(user, group_id, level, precision):
+    # The request's session is gone by the time the body streams, so the
+    # export reads through its own
+    async with read_session(user.id, user.fields_version) as db:
+        rows = await db.stream(
+            group_fields_query(
+                group_id,
+                Field.id,
+                Field.area_hectares,
+                Field.ndvi_status,
+                GEOMETRY_COLUMNS[level].label("geometry"),
+            ).execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+
+        yield '{"type": "FeatureCollection", "features": ['
+        separator = ""
+        async for f in rows:
+            feature = {
+                "type": "Feature",
+                "properties": {
+                    "id": f.id,
+                    "area_hectares": f.area_hectares,
+                    "ndvi_status": f.ndvi_status,
+                },
+                "geometry": geometry_to_geojson(to_shape(f.geometry), precision),
+            }
+            yield separator + json.dumps(feature)
+            separator = ","
+        yield "]}"
+
+
+@router.get(
+    "/groups/{group_id}/export/geojson", dependencies=[Depends(auth.rate_limit("bulk"))]
+)
+async def export_group_geojson(
+    group_id: int,
+    simplify: str = "full",
+    precision: Optional[int] = None,
+    db: AsyncSession = Depends(auth.get_read_db),
+    current_user: User = Depends(auth.get_current_user)
+):
+    """The group as one FeatureCollection, streamed in batches."""
+    level = resolve_simplify_level(simplify)
+    group = await get_user_group(db, current_user.id, group_id)
+
+    # Validated up front; an error mid-stream would truncate the body
+    if precision is not None:
+        validate_precision(precision)
+
+    return StreamingResponse(
+        _stream_group_geojson(current_user, group.id, level, precision),
+        media_type="application/geo+json",
+        headers={
+            "Content-Disposition": f"attachment; filename=group-{group.id}.geojson",
+        },
+    )
+
+
+# =========================
+# DELETE GROUP
+# =========================
+@router.delete("/groups/{group_id}")
+async def delete_group(
+    group_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(auth.get_current_user)
+):
+    """Delete the group; its fields are kept."""
+    await bump_fields_version(db, current_user.id)
+
+    group = await get_user_group(db, current_user.id, group_id)
+    await db.delete(group)
+    await db.commit()
+
+    return {"message": "Group deleted", "id": group_id}
@@ -1,7 +1,22 @@
+import os
+import shutil
+import sys
+import threading
+import time
+
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db.database import async_engine, engine
 
 router = APIRouter()
 
+_readiness_cache = {"checked_at": 0.0, "ready": False, "checks": {}}
+_readiness_lock = threading.Lock()
+
+
 @router.get("/health")
 def health_check():
     return {
@@ -9,3 +24,98 @@ def health_check():
         "service": "AGSIE Backend",
         "version": "v1"
     }
+
+
+# =========================
+# LIVENESS
+# =========================
+@router.get("/health/live")
+def liveness():
+    # The event loop answered; nothing else should restart the pod
+    return {"status": "ok"}
+
+
+# =========================
+# READINESS
+# =========================
+def _check_pool():
+    # The async pool is the one request handlers draw from
+    pool = async_engine.pool
+    capacity = pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+    saturation = pool.checkedout() / capacity if capacity else 0.0
+
+    return {
+        "ok": saturation < settings.READINESS_MAX_POOL_SATURATION,
+        "checked_out": pool.checkedout(),
+        "capacity": capacity,
+        "saturation": round(saturation, 3),
+    }
+
+
+def _check_database():
+    started = time.perf_counter()
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except Exception as exc:
+        return {"ok": False, "error": type(exc).__name__}
+
+    latency_ms = (time.perf_counter() - started) * 1000
+
+    return {
+        "ok": latency_ms < settings.READINESS_MAX_DB_LATENCY_MS,
+        "latency_ms": round(latency_ms, 2),
+    }
+
+
+def _check_queue():
+    # No raster work can be queued before the satellite stack is imported
+    raster_pool = sys.modules.get("app.services.satellite.raster_pool")
+    depth = raster_pool.pending_tasks() if raster_pool is not None else 0
+
+    return {
+        "ok": depth < settings.READINESS_MAX_QUEUE_DEPTH,
+        "depth": depth,
+    }
+
+
+def _check_cache_disk():
+    path = settings.CACHE_DIR
+    while not os.path.exists(path):
+        path = os.path.dirname(path)
+
+    free_mb = shutil.disk_usage(path).free / (1024 * 1024)
+
+    return {
+        "ok": free_mb >= settings.READINESS_MIN_FREE_DISK_MB,
+        "free_mb": round(free_mb),
+    }
+
+
+def _run_checks():
+    # Pool saturation is sampled before the DB check borrows a connection
+    checks = {
+        "pool": _check_pool(),
+        "database": _check_database(),
+        "queue": _check_queue(),
+        "cache_disk": _check_cache_disk(),
+    }
+
+    return all(check["ok"] for check in checks.values()), checks
+
+
+@router.get("/health/ready")
+def readiness():
+    with _readiness_lock:
+        now = time.monotonic()
+        if now - _readiness_cache["checked_at"] >= settings.READINESS_CACHE_SECONDS:
+            ready, checks = _run_checks()
+            _readiness_cache.update(checked_at=now, ready=ready, checks=checks)
+
+        ready = _readiness_cache["ready"]
+        checks = _readiness_cache["checks"]
+
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "unavailable", "checks": checks},
+    )
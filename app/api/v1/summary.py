@@ -0,0 +1,66 @@
+import math
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1 import auth
+from app.models.ndvi_summary import RegionNdviSummary, UserNdviSummary
+from app.models.user import User
+from app.services.ndvi_summary import month_of, summary_to_dict
+
+router = APIRouter()
+
+
+def _parse_month(month):
+    if month is None:
+        return month_of(datetime.utcnow())
+
+    try:
+        return datetime.strptime(month, "%Y-%m").date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="month must be YYYY-MM")
+
+
+# =========================
+# NDVI SUMMARY
+# =========================
+@router.get("/summary", dependencies=[Depends(auth.rate_limit("read"))])
+async def get_summary(
+    month: Optional[str] = None,
+    lon: Optional[float] = None,
+    lat: Optional[float] = None,
+    db: AsyncSession = Depends(auth.get_analyses_read_db),
+    current_user: User = Depends(auth.get_current_user)
+):
+    """
+    Area-weighted mean NDVI and status distribution of the user's fields for
+    one month (default: the current one), plus the organization-wide figures
+    of the 1 degree region containing (lon, lat) when given. Each field
+    counts once, with its latest analysis of the month.
+    """
+    first_day = _parse_month(month)
+
+    user_summary = await db.get(UserNdviSummary, (current_user.id, first_day))
+
+    result = {
+        "month": first_day.strftime("%Y-%m"),
+        "user": summary_to_dict(user_summary),
+    }
+
+    if lon is not None and lat is not None:
+        if not (-180 <= lon <= 180 and -90 <= lat <= 90):
+            raise HTTPException(
+                status_code=400,
+                detail="Coordinates must be in WGS84 (EPSG:4326)"
+            )
+
+        cell = (math.floor(lon), math.floor(lat))
+        region_summary = await db.get(RegionNdviSummary, (*cell, first_day))
+        result["region"] = {
+            "cell": list(cell),
+            **summary_to_dict(region_summary),
+        }
+
+    return result
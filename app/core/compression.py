@@ -0,0 +1,169 @@
+"""
+Response compression.
+
+Buffered responses above COMPRESSION_MIN_SIZE are compressed with brotli
+when the optional `brotli` package is installed and the client accepts it,
+otherwise with gzip. Streaming responses and already-compressed media types
+pass through untouched. 304s get the encoded ETag the client revalidates
+and the same Vary header.
+"""
+import gzip
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+INCOMPRESSIBLE_TYPES = ("application/zip", "application/gzip", "image/")
+
+# Suffix appended to ETags of encoded representations, so a strong ETag
+# always identifies one exact byte sequence
+ENCODING_ETAG_SUFFIXES = {"br": "-br", "gzip": "-gzip"}
+
+
+def _accepted_encodings(scope):
+    for name, value in scope["headers"]:
+        if name == b"accept-encoding":
+            accepted = set()
+            for part in value.decode("latin-1").split(","):
+                token, _, params = part.strip().partition(";")
+                if params.strip().replace(" ", "") in ("q=0", "q=0.0"):
+                    continue
+                accepted.add(token.strip().lower())
+            return accepted
+
+    return set()
+
+
+def _choose_encoding(scope):
+    accepted = _accepted_encodings(scope)
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def _encoded_etag(etag, encoding):
+    return etag[:-1] + ENCODING_ETAG_SUFFIXES[encoding] + '"'
+
+
+def _cached_etag(scope, etag):
+    """
+    The form of `etag` the client's If-None-Match names: a 304 must carry
+    the ETag of the representation the client holds, which is the encoded
+    one when the earlier 200 was compressed.
+    """
+    for name, value in scope["headers"]:
+        if name == b"if-none-match":
+            tags = [tag.strip() for tag in value.decode("latin-1").split(",")]
+            for encoding in ENCODING_ETAG_SUFFIXES:
+                encoded = _encoded_etag(etag, encoding)
+                if encoded in tags or "W/" + encoded in tags:
+                    return encoded
+
+    return etag
+
+
+def _compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = _choose_encoding(scope)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+
+            if message["type"] == "http.response.start":
+                if message["status"] == 304:
+                    # No body to encode, but the headers must match the
+                    # 200 the client revalidates
+                    headers = _Headers(message["headers"])
+                    headers.append_vary("Accept-Encoding")
+                    etag = headers.get("etag")
+                    if etag and etag.endswith('"'):
+                        headers.set("etag", _cached_etag(scope, etag))
+                    passthrough = True
+                    await send({**message, "headers": headers.raw})
+                    return
+
+                start_message = message
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = _Headers(start_message["headers"])
+            content_type = headers.get("content-type", "")
+
+            if (
+                message.get("more_body", False)
+                or len(body) < settings.COMPRESSION_MIN_SIZE
+                or "content-encoding" in headers
+                or content_type.startswith(INCOMPRESSIBLE_TYPES)
+            ):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = _compress(body, encoding)
+
+            headers.set("content-encoding", encoding)
+            headers.set("content-length", str(len(compressed)))
+            headers.append_vary("Accept-Encoding")
+            etag = headers.get("etag")
+            if etag and etag.endswith('"'):
+                headers.set("etag", _encoded_etag(etag, encoding))
+
+            await send({**start_message, "headers": headers.raw})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class _Headers:
+    """Minimal mutable view over raw ASGI header pairs."""
+
+    def __init__(self, raw):
+        self.raw = list(raw)
+
+    def __contains__(self, name):
+        return self.get(name) is not None
+
+    def get(self, name, default=None):
+        key = name.encode("latin-1")
+        for header, value in self.raw:
+            if header.lower() == key:
+                return value.decode("latin-1")
+        return default
+
+    def set(self, name, value):
+        key = name.encode("latin-1")
+        self.raw = [(h, v) for h, v in self.raw if h.lower() != key]
+        self.raw.append((key, value.encode("latin-1")))
+
+    def append_vary(self, value):
+        existing = self.get("vary")
+        self.set("vary", f"{existing}, {value}" if existing else value)
@@ -6,6 +6,84 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
 
+    # Nightly scene-major NDVI refresh
+    REFRESH_HOUR_UTC: int = 2
+    REFRESH_INITIAL_LOOKBACK_DAYS: int = 7
+    # Scenes are searched per populated grid cell of this size
+    REFRESH_SEARCH_CELL_DEGREES: float = 1.0
+
+    # Web worker processes, as read by uvicorn and gunicorn
+    WEB_CONCURRENCY: int = 1
+
+    # Raster worker processes per web worker (unset: the cores divided
+    # among the web workers, 0: compute inline)
+    RASTER_WORKERS: int | None = None
+    RASTER_POOL_MIN_PIXELS: int = 262144
+    RASTER_TASK_TIMEOUT_SECONDS: float = 120
+    # Fields with more pixels are streamed block by block in bounded memory
+    ZONAL_STREAM_MIN_PIXELS: int = 1048576
+
+    # Scene catalog: "stac" (STAC_API_URL) or "local" (a directory mirror
+    # written by app.services.satellite.scene_mirror, read without network)
+    SCENE_SOURCE: str = "stac"
+    STAC_API_URL: str = "https://earth-search.aws.element84.com/v1/search"
+    SCENE_CATALOG_DIR: str = "/var/lib/agsie/scenes"
+
+    # GDAL profile for satellite reads (see app.services.satellite.gdal_env)
+    GDAL_CACHEMAX_MB: int = 256
+    GDAL_VSI_CACHE_SIZE_MB: int = 64
+    GDAL_HTTP_MULTIPLEX: bool = True
+    GDAL_HTTP_MAX_RETRY: int = 3
+    GDAL_ALLOWED_EXTENSIONS: str = ".tif,.tiff,.TIF,.jp2"
+    GDAL_HTTP_STATS: bool = True
+
+    # Open band datasets kept per process for reuse across analyses
+    DATASET_POOL_MAX_HANDLES: int = 32
+    DATASET_POOL_IDLE_SECONDS: float = 300
+
+    # Overlaps between a user's fields smaller than this are ignored
+    FIELD_OVERLAP_MIN_AREA_M2: float = 100
+    # Features accepted by one POST /fields/import
+    FIELD_IMPORT_MAX_FEATURES: int = 5000
+
+    # Projected field geometries and pixel masks kept per process
+    GEOMETRY_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+
+    # Per-user rate limits and in-flight caps by route cost class, kept in
+    # "memory" (per process) or "postgres" (shared across workers)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_READ_PER_MINUTE: float = 600
+    RATE_LIMIT_READ_BURST: int = 100
+    RATE_LIMIT_READ_CONCURRENCY: int = 16
+    RATE_LIMIT_ANALYZE_PER_MINUTE: float = 30
+    RATE_LIMIT_ANALYZE_BURST: int = 10
+    RATE_LIMIT_ANALYZE_CONCURRENCY: int = 2
+    RATE_LIMIT_BULK_PER_MINUTE: float = 10
+    RATE_LIMIT_BULK_BURST: int = 3
+    RATE_LIMIT_BULK_CONCURRENCY: int = 1
+    RATE_LIMIT_CONCURRENCY_RETRY_SECONDS: int = 1
+    RATE_LIMIT_LEASE_SECONDS: int = 300
+
+    # Readiness probe thresholds
+    READINESS_CACHE_SECONDS: float = 2
+    READINESS_MAX_DB_LATENCY_MS: float = 250
+    READINESS_MAX_POOL_SATURATION: float = 0.9
+    READINESS_MAX_QUEUE_DEPTH: int = 64
+    READINESS_MIN_FREE_DISK_MB: int = 512
+
+    # Local disk used for tile/scene caches
+    CACHE_DIR: str = "/tmp/agsie-cache"
+
+    # Response compression
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 5
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # Routers served by this process: "all", "api" (no satellite analysis)
+    # or "worker" (analysis only, satellite stack loaded at startup)
+    APP_ROLE: str = "all"
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,50 @@
+import hashlib
+
+from fastapi import Response
+
+from app.core.compression import ENCODING_ETAG_SUFFIXES
+
+
+def make_etag(*parts):
+    """Strong ETag derived from the version numbers identifying a response."""
+    digest = hashlib.blake2b(
+        "|".join(str(part) for part in parts).encode(), digest_size=12
+    ).hexdigest()
+
+    return f'"{digest}"'
+
+
+def _normalize(tag):
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+
+    for suffix in ENCODING_ETAG_SUFFIXES.values():
+        if tag.endswith(suffix + '"'):
+            return tag[: -len(suffix) - 1] + '"'
+
+    return tag
+
+
+def etag_matches(request, etag):
+    """True if the request's If-None-Match already names `etag`."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+
+    if header.strip() == "*":
+        return True
+
+    return any(_normalize(tag) == etag for tag in header.split(","))
+
+
+def not_modified(etag):
+    return Response(
+        status_code=304,
+        headers={"ETag": etag, "Cache-Control": "private, no-cache"},
+    )
+
+
+def set_etag(response, etag):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
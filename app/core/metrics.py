@@ -0,0 +1,204 @@
+"""
+Prometheus instrumentation.
+
+MetricsMiddleware times every request per route template and attributes
+the SQL executed while serving it (via engine cursor events) to that route.
+The satellite pipeline reports per-stage timings through `observe_stage`.
+Everything is exposed in Prometheus text format at `/metrics`.
+"""
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route template",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests currently being served",
+    multiprocess_mode="livesum",
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds",
+    "Time spent in SQL per request",
+    ["route"],
+)
+DB_QUERY_SECONDS = Histogram(
+    "db_query_duration_seconds",
+    "Latency of individual SQL statements",
+)
+STAGE_SECONDS = Histogram(
+    "satellite_stage_duration_seconds",
+    "Satellite pipeline stage latency",
+    ["stage"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+BAND_READ_BYTES = Counter(
+    "satellite_band_read_bytes_total",
+    "Decoded raster bytes read from band sources",
+)
+DATASET_POOL_LOOKUPS = Counter(
+    "satellite_dataset_pool_lookups_total",
+    "Band dataset acquisitions served from an idle pooled handle (hit) or a fresh open (miss)",
+    ["result"],
+)
+GDAL_HTTP_REQUESTS = Histogram(
+    "satellite_gdal_http_requests",
+    "HTTP requests GDAL issued per tracked raster operation",
+    ["operation"],
+    buckets=(0, 1, 2, 3, 4, 6, 8, 12, 16, 32, 64, 128),
+)
+GDAL_HTTP_BYTES = Counter(
+    "satellite_gdal_http_bytes_total",
+    "Bytes GDAL requested over HTTP range reads",
+)
+RATE_LIMIT_REJECTIONS = Counter(
+    "rate_limit_rejections_total",
+    "Requests rejected with 429 by cost class and limit (rate or concurrency)",
+    ["cost_class", "reason"],
+)
+SINGLEFLIGHT_CALLS = Counter(
+    "singleflight_calls_total",
+    "Coalesced operations that started the work (leader) or joined one in flight (shared)",
+    ["operation", "result"],
+)
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+# Mutable per-request accumulator; context copies into the threadpool share it
+_request_stats: ContextVar[RequestStats | None] = ContextVar(
+    "request_stats", default=None
+)
+
+
+# =========================
+# SATELLITE STAGES
+# =========================
+@contextmanager
+def observe_stage(stage):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.labels(stage=stage).observe(time.perf_counter() - started)
+
+
+# =========================
+# DATABASE HOOKS
+# =========================
+def instrument_engine(engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        DB_QUERY_SECONDS.observe(elapsed)
+
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_started"):
+            conn.info["query_started"].pop()
+
+
+# =========================
+# MIDDLEWARE
+# =========================
+def _route_template(scope):
+    # The matched route's own template, so ids (however spelled: 7, 007)
+    # never become label values. Routes of included routers report it
+    # without the include prefix, which is the part of the concrete path in
+    # front of what the route matches
+    route = scope.get("route")
+    if route is None or not hasattr(route, "path_format"):
+        return "unmatched"
+
+    path = scope["path"]
+    for index, char in enumerate(path):
+        if char == "/" and route.path_regex.match(path[index:]):
+            return path[:index] + route.path_format
+
+    return route.path_format
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            REQUESTS_IN_FLIGHT.dec()
+            _request_stats.reset(token)
+
+            route_path = _route_template(scope)
+
+            REQUEST_LATENCY.labels(
+                method=scope["method"], route=route_path, status=status_code
+            ).observe(elapsed)
+            REQUEST_DB_QUERIES.labels(route=route_path).observe(stats.queries)
+            REQUEST_DB_SECONDS.labels(route=route_path).observe(stats.db_seconds)
+
+
+def render_metrics():
+    """Return (body, content type); aggregates workers in multiprocess mode."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+
+    return generate_latest(), CONTENT_TYPE_LATEST
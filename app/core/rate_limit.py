@@ -0,0 +1,196 @@
+"""
+Per-user rate limits and concurrency quotas by route cost class.
+
+Every limited route belongs to a cost class ("read", "analyze", "bulk").
+Each (user, class) pair has a token bucket refilled at the class's rate up
+to its burst size, and a cap on requests in flight at once. A request takes
+an in-flight slot first and then a token, so a request rejected for
+concurrency doesn't use up the user's rate.
+
+RATE_LIMIT_BACKEND picks where the state lives:
+- "memory": per process; limits apply per worker
+- "postgres": shared by every worker through two UNLOGGED tables, with the
+  (user, class) bucket row locked while a decision is made
+"""
+import math
+import threading
+import time
+from collections import namedtuple
+from datetime import timedelta
+
+from sqlalchemy import text
+
+from app.core.config import settings
+
+# Refill rate (tokens per second), bucket size and in-flight cap of a class
+Limits = namedtuple("Limits", ["rate", "burst", "concurrency"])
+
+COST_CLASSES = ("read", "analyze", "bulk")
+
+
+def class_limits(cost_class):
+    prefix = f"RATE_LIMIT_{cost_class.upper()}"
+    return Limits(
+        getattr(settings, f"{prefix}_PER_MINUTE") / 60,
+        getattr(settings, f"{prefix}_BURST"),
+        getattr(settings, f"{prefix}_CONCURRENCY"),
+    )
+
+
+class RateLimited(Exception):
+    def __init__(self, reason, retry_after):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def _retry_after(tokens, limits):
+    """Whole seconds until the bucket holds one token again."""
+    return max(math.ceil((1 - tokens) / limits.rate), 1)
+
+
+# =========================
+# IN-MEMORY BACKEND
+# =========================
+class MemoryRateLimiter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._in_flight = {}
+
+    async def acquire(self, user_id, cost_class):
+        """Take a slot and a token; returns a lease or raises RateLimited."""
+        limits = class_limits(cost_class)
+        key = (user_id, cost_class)
+        now = time.monotonic()
+
+        with self._lock:
+            if self._in_flight.get(key, 0) >= limits.concurrency:
+                raise RateLimited(
+                    "concurrency", settings.RATE_LIMIT_CONCURRENCY_RETRY_SECONDS
+                )
+
+            tokens, updated = self._buckets.get(key, (limits.burst, now))
+            tokens = min(limits.burst, tokens + (now - updated) * limits.rate)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now)
+                raise RateLimited("rate", _retry_after(tokens, limits))
+
+            self._buckets[key] = (tokens - 1, now)
+            self._in_flight[key] = self._in_flight.get(key, 0) + 1
+
+        return key
+
+    async def release(self, lease):
+        with self._lock:
+            remaining = self._in_flight.get(lease, 0) - 1
+            if remaining > 0:
+                self._in_flight[lease] = remaining
+            else:
+                self._in_flight.pop(lease, None)
+
+
+# =========================
+# POSTGRES BACKEND
+# =========================
+ENSURE_BUCKET_SQL = text("""
+    INSERT INTO rate_limit_buckets (user_id, cost_class, tokens, updated_at)
+    VALUES (:user_id, :cost_class, CAST(:burst AS float8), now())
+    ON CONFLICT (user_id, cost_class) DO NOTHING
+""")
+
+LOCK_BUCKET_SQL = text("""
+    SELECT least(
+        CAST(:burst AS float8),
+        tokens + extract(epoch FROM now() - updated_at)::float8 * CAST(:rate AS float8)
+    )
+    FROM rate_limit_buckets
+    WHERE user_id = :user_id AND cost_class = :cost_class
+    FOR UPDATE
+""")
+
+IN_FLIGHT_SQL = text("""
+    SELECT count(*) FROM rate_limit_leases
+    WHERE user_id = :user_id AND cost_class = :cost_class AND expires_at > now()
+""")
+
+UPDATE_BUCKET_SQL = text("""
+    UPDATE rate_limit_buckets SET tokens = CAST(:tokens AS float8), updated_at = now()
+    WHERE user_id = :user_id AND cost_class = :cost_class
+""")
+
+PRUNE_LEASES_SQL = text("""
+    DELETE FROM rate_limit_leases
+    WHERE user_id = :user_id AND cost_class = :cost_class AND expires_at <= now()
+""")
+
+INSERT_LEASE_SQL = text("""
+    INSERT INTO rate_limit_leases (user_id, cost_class, expires_at)
+    VALUES (:user_id, :cost_class, now() + CAST(:ttl AS interval))
+    RETURNING id
+""")
+
+
+class PostgresRateLimiter:
+    def __init__(self, engine):
+        self.engine = engine
+
+    async def acquire(self, user_id, cost_class):
+        limits = class_limits(cost_class)
+        params = {
+            "user_id": user_id,
+            "cost_class": cost_class,
+            "rate": limits.rate,
+            "burst": limits.burst,
+        }
+
+        async with self.engine.begin() as conn:
+            await conn.execute(ENSURE_BUCKET_SQL, params)
+            # Serializes decisions for this user and class across workers
+            tokens = (await conn.execute(LOCK_BUCKET_SQL, params)).scalar_one()
+
+            in_flight = (await conn.execute(IN_FLIGHT_SQL, params)).scalar_one()
+            if in_flight >= limits.concurrency:
+                raise RateLimited(
+                    "concurrency", settings.RATE_LIMIT_CONCURRENCY_RETRY_SECONDS
+                )
+
+            if tokens < 1:
+                raise RateLimited("rate", _retry_after(tokens, limits))
+
+            await conn.execute(UPDATE_BUCKET_SQL, {**params, "tokens": tokens - 1})
+            await conn.execute(PRUNE_LEASES_SQL, params)
+            return (await conn.execute(INSERT_LEASE_SQL, {
+                **params,
+                "ttl": timedelta(seconds=settings.RATE_LIMIT_LEASE_SECONDS),
+            })).scalar_one()
+
+    async def release(self, lease):
+        async with self.engine.begin() as conn:
+            await conn.execute(
+                text("DELETE FROM rate_limit_leases WHERE id = :id"), {"id": lease}
+            )
+
+
+RATE_LIMIT_BACKENDS = ("memory", "postgres")
+
+_limiter = None
+
+
+def get_rate_limiter():
+    """The process-wide limiter selected by RATE_LIMIT_BACKEND."""
+    global _limiter
+
+    if _limiter is None:
+        if settings.RATE_LIMIT_BACKEND == "memory":
+            _limiter = MemoryRateLimiter()
+        elif settings.RATE_LIMIT_BACKEND == "postgres":
+            from app.db.database import async_engine
+
+            _limiter = PostgresRateLimiter(async_engine)
+        else:
+            raise ValueError(
+                f"RATE_LIMIT_BACKEND must be one of {', '.join(RATE_LIMIT_BACKENDS)}"
+            )
+
+    return _limiter
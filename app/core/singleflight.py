@@ -0,0 +1,42 @@
+"""
+Coalescing of concurrent identical work ("single-flight").
+
+The first caller for a key starts the work; callers arriving while it runs
+await the same result (or exception) instead of repeating it. Nothing is
+cached: once the work finishes, the next call for the key starts afresh.
+
+The work runs as its own task and callers await it through asyncio.shield,
+so a client disconnecting never cancels the computation the others wait on.
+Keys are coalesced per event loop, i.e. per worker process.
+"""
+import asyncio
+
+from app.core.metrics import SINGLEFLIGHT_CALLS
+
+
+class SingleFlight:
+    def __init__(self, name):
+        self.name = name
+        self._inflight = {}
+
+    async def run(self, key, fn, *args):
+        """Result of `await fn(*args)`, shared with concurrent calls for `key`."""
+        task = self._inflight.get(key)
+
+        if task is None:
+            SINGLEFLIGHT_CALLS.labels(operation=self.name, result="leader").inc()
+            task = asyncio.ensure_future(fn(*args))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._forget(key, task))
+        else:
+            SINGLEFLIGHT_CALLS.labels(operation=self.name, result="shared").inc()
+
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Retrieve the exception so an unawaited failure is not logged as
+        # "never retrieved" when every waiter has gone away
+        if not task.cancelled():
+            task.exception()
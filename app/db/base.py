@@ -4,3 +4,7 @@ from app.db.database import Base
 from app.models.user import User
 from app.models.field import Field
 from app.models.field_analysis import FieldAnalysis
+from app.models.scene_refresh_run import SceneRefreshRun
+from app.models.ndvi_summary import UserNdviSummary, RegionNdviSummary
+from app.models.rate_limit import RateLimitBucket, RateLimitLease
+from app.models.field_group import FieldGroup, FieldGroupMember
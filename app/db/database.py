@@ -1,13 +1,35 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.orm import declarative_base
 import os
 
+from app.core.metrics import instrument_engine
+
 DATABASE_URL = os.getenv(
     "DATABASE_URL",
     "postgresql://agsie:agsie@db:5432/agsie_db"
 )
 
+# Sync engine: Alembic, the scene refresh job and health checks
 engine = create_engine(DATABASE_URL, echo=True)
+instrument_engine(engine)
 
-Base = declarative_base()
+# Async engine (asyncpg) for the request handlers, so a request waiting on
+# the database doesn't hold a threadpool thread
+ASYNC_DATABASE_URL = make_url(DATABASE_URL).set(drivername="postgresql+asyncpg")
+
+async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=True)
+instrument_engine(async_engine.sync_engine)
 
+# Optional streaming replica for read-only routes
+READ_REPLICA_URL = os.getenv("READ_REPLICA_URL")
+
+replica_async_engine = None
+if READ_REPLICA_URL:
+    replica_async_engine = create_async_engine(
+        make_url(READ_REPLICA_URL).set(drivername="postgresql+asyncpg"), echo=True
+    )
+    instrument_engine(replica_async_engine.sync_engine)
+
+Base = declarative_base()
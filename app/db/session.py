@@ -1,5 +1,10 @@
+from contextlib import asynccontextmanager
+
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import sessionmaker
-from app.db.database import engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.db.database import engine, async_engine, replica_async_engine
 
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -7,9 +12,71 @@ SessionLocal = sessionmaker(
     bind=engine,
 )
 
+# Objects stay usable after commit; lazy loads would need a round trip the
+# async session can't make implicitly
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+ReplicaSessionLocal = None
+if replica_async_engine is not None:
+    ReplicaSessionLocal = async_sessionmaker(
+        bind=replica_async_engine,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def _replica_caught_up(db, user_id, fields_version, analyses_version):
+    from app.models.user import User
+
+    try:
+        replica = (await db.execute(
+            select(User.fields_version, User.analyses_version).where(User.id == user_id)
+        )).first()
+    except (SQLAlchemyError, OSError):
+        # An unreachable replica degrades to primary reads
+        return False
+
+    return (
+        replica is not None
+        and replica.fields_version >= fields_version
+        and (analyses_version is None or replica.analyses_version >= analyses_version)
+    )
+
+
+@asynccontextmanager
+async def read_session(user_id, fields_version, analyses_version=None):
+    """
+    Session for read-only queries on a user's fields. The replica is used
+    once it has replayed the user's latest write, i.e. its copy of the
+    user's collection version has reached `fields_version` as read from the
+    primary. Until then reads stay on the primary, so a user always sees
+    their own writes, whichever worker served them.
+
+    Reads of stored analyses and NDVI summaries also pass
+    `analyses_version`, which analysis writes bump without touching the
+    collection version.
+    """
+    if ReplicaSessionLocal is not None:
+        async with ReplicaSessionLocal() as db:
+            if await _replica_caught_up(db, user_id, fields_version, analyses_version):
+                yield db
+                return
+
+    async with AsyncSessionLocal() as db:
+        yield db
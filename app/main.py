@@ -1,28 +1,70 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api.v1.health import router as health_router
-from app.api.v1.fields import router as fields_router
-from app.api.v1.auth import router as auth_router
+from app.core.compression import CompressionMiddleware
+from app.core.config import settings
+from app.core.metrics import MetricsMiddleware, render_metrics
 
+APP_ROLES = ("all", "api", "worker")
 
-app = FastAPI(title="AGSIE Backend")
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:5173"],  # frontend
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+def _include_routers(app, role):
+    # Routers are imported here so a process only loads what its role serves
+    from app.api.v1.health import router as health_router
 
-app.include_router(health_router, prefix="/api/v1")
-app.include_router(fields_router, prefix="/api/v1")
-app.include_router(auth_router, prefix="/api/v1")
+    app.include_router(health_router, prefix="/api/v1")
 
-@app.get("/")
-def root():
-    return {"status": "AGSIE backend running"}
+    if role in ("all", "api"):
+        from app.api.v1.fields import router as fields_router
+        from app.api.v1.auth import router as auth_router
+        from app.api.v1.groups import router as groups_router
+        from app.api.v1.summary import router as summary_router
 
+        app.include_router(fields_router, prefix="/api/v1")
+        app.include_router(auth_router, prefix="/api/v1")
+        app.include_router(groups_router, prefix="/api/v1")
+        app.include_router(summary_router, prefix="/api/v1")
 
+    if role in ("all", "worker"):
+        from app.api.v1.analysis import load_satellite_stack, router as analysis_router
 
+        app.include_router(analysis_router, prefix="/api/v1")
+
+        # Analysis is all a worker does: pay the GDAL import at startup
+        # rather than on its first request
+        if role == "worker":
+            load_satellite_stack()
+
+
+def create_app(role=None):
+    role = role or settings.APP_ROLE
+    if role not in APP_ROLES:
+        raise ValueError(f"APP_ROLE must be one of {', '.join(APP_ROLES)}")
+
+    app = FastAPI(title="AGSIE Backend")
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["http://localhost:5173"],  # frontend
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    app.add_middleware(CompressionMiddleware)
+    app.add_middleware(MetricsMiddleware)
+
+    _include_routers(app, role)
+
+    @app.get("/")
+    def root():
+        return {"status": "AGSIE backend running"}
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        body, content_type = render_metrics()
+        return Response(content=body, media_type=content_type)
+
+    return app
+
+
+app = create_app()
@@ -1,11 +1,31 @@
-from sqlalchemy import Column, Integer, Float, String, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    Column, Integer, BigInteger, Float, String, DateTime, ForeignKey, Index, Sequence
+)
+from sqlalchemy.sql import func, text
+from sqlalchemy.orm import relationship, deferred
 from geoalchemy2 import Geometry
 
 from app.db.database import Base   
 
+# Global, monotonic change counter shared by all fields; doubles as the
+# change feed cursor
+FIELDS_VERSION_SEQ = Sequence("fields_version_seq", metadata=Base.metadata)
+
+
 class Field(Base):
     __tablename__ = "fields"
+    __table_args__ = (
+        Index("ix_fields_user_id_version", "user_id", "version"),
+        Index("ix_fields_bbox", "bbox_west", "bbox_south", "bbox_east", "bbox_north"),
+        # Overlap checks search one user's live fields; needs btree_gist
+        Index(
+            "ix_fields_user_id_geometry",
+            "user_id",
+            "geometry",
+            postgresql_using="gist",
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -15,6 +35,31 @@ class Field(Base):
 
     area_hectares = Column(Float, nullable=False)
     ndvi_status = Column(String, nullable=False)
+
+    # Redrawn from FIELDS_VERSION_SEQ on every write; source of the field's
+    # ETag and of the change feed cursor
+    version = Column(
+        BigInteger,
+        server_default=FIELDS_VERSION_SEQ.next_value(),
+        nullable=False,
+    )
+
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+    # Soft-delete tombstone, kept so syncing clients learn about deletions
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Spatial statistics precomputed at write time
+    bbox_west = Column(Float, nullable=False)
+    bbox_south = Column(Float, nullable=False)
+    bbox_east = Column(Float, nullable=False)
+    bbox_north = Column(Float, nullable=False)
+    perimeter_m = Column(Float, nullable=False)
+    vertex_count = Column(Integer, nullable=False)
     
     analyses = relationship(
     "FieldAnalysis",
@@ -22,10 +67,30 @@ class Field(Base):
     cascade="all, delete"
 )
 
+    # Always stored as a MultiPolygon; single-part fields have one member
     geometry = Column(
-        Geometry(geometry_type="POLYGON", srid=4326),
+        Geometry(geometry_type="MULTIPOLYGON", srid=4326),
+        nullable=False
+    )
+
+    # Topology-preserving simplifications for list and map responses
+    geometry_medium = deferred(Column(
+        Geometry(geometry_type="MULTIPOLYGON", srid=4326, spatial_index=False),
+        nullable=False
+    ))
+    geometry_low = deferred(Column(
+        Geometry(geometry_type="MULTIPOLYGON", srid=4326, spatial_index=False),
+        nullable=False
+    ))
+
+    centroid = Column(
+        Geometry(geometry_type="POINT", srid=4326),
         nullable=False
     )
 
+    @property
+    def bbox(self):
+        return [self.bbox_west, self.bbox_south, self.bbox_east, self.bbox_north]
+
 
 
@@ -1,17 +1,82 @@
-from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    Column, BigInteger, Integer, Float, DateTime, ForeignKey, Index, Sequence, event, text
+)
+from sqlalchemy.orm import Session, relationship
 from datetime import datetime
 
 from app.db.database import Base
 
+FIELD_ANALYSIS_ID_SEQ = Sequence("field_analysis_id_seq", metadata=Base.metadata)
+
 
 class FieldAnalysis(Base):
+    """
+    One NDVI result per field and scene date. The table is range-partitioned
+    by scene_date into yearly partitions (field_analysis_y<year>), so the
+    primary key has to include scene_date.
+    """
     __tablename__ = "field_analysis"
+    __table_args__ = (
+        Index(
+            "ux_field_analysis_field_id_scene_date",
+            "field_id", "scene_date",
+            unique=True,
+        ),
+        Index(
+            "ix_field_analysis_scene_date_brin",
+            "scene_date",
+            postgresql_using="brin",
+        ),
+        {"postgresql_partition_by": "RANGE (scene_date)"},
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
-    field_id = Column(Integer, ForeignKey("fields.id", ondelete="CASCADE"))
+    id = Column(
+        BigInteger,
+        primary_key=True,
+        autoincrement=False,
+        server_default=FIELD_ANALYSIS_ID_SEQ.next_value(),
+    )
+    field_id = Column(
+        Integer, ForeignKey("fields.id", ondelete="CASCADE"), nullable=False
+    )
     ndvi_mean = Column(Float, nullable=False)
-    scene_date = Column(DateTime, nullable=False)
+    scene_date = Column(DateTime, primary_key=True, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
-    field = relationship("Field", back_populates="analyses")
\ No newline at end of file
+    field = relationship("Field", back_populates="analyses")
+
+
+def partition_name(year):
+    return f"field_analysis_y{year}"
+
+
+# Years whose partition this process has seen committed; inserts into them
+# skip the DDL
+_partition_years = set()
+
+
+def ensure_partitions(db, years):
+    """Create the yearly partitions for `years` that don't exist yet."""
+    missing = sorted(set(years) - _partition_years)
+    if not missing:
+        return
+
+    for year in missing:
+        db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {partition_name(year)} "
+            f"PARTITION OF field_analysis "
+            f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+        ))
+
+    # A rolled back CREATE leaves no partition, so only remember committed ones
+    db.info.setdefault("new_partition_years", set()).update(missing)
+
+
+@event.listens_for(Session, "after_commit")
+def _remember_partitions(session):
+    _partition_years.update(session.info.pop("new_partition_years", ()))
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_partitions(session):
+    session.info.pop("new_partition_years", None)
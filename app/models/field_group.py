@@ -0,0 +1,50 @@
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy.sql import func
+
+from app.db.database import Base
+
+
+class FieldGroup(Base):
+    """A farm or block: a named set of one user's fields."""
+
+    __tablename__ = "field_groups"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    name = Column(String, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+
+    # Extent of the live member fields, kept current on membership and
+    # geometry changes so STAC lookups never aggregate the members; NULL
+    # while the group is empty
+    bbox_west = Column(Float, nullable=True)
+    bbox_south = Column(Float, nullable=True)
+    bbox_east = Column(Float, nullable=True)
+    bbox_north = Column(Float, nullable=True)
+
+    @property
+    def bbox(self):
+        if self.bbox_west is None:
+            return None
+        return [self.bbox_west, self.bbox_south, self.bbox_east, self.bbox_north]
+
+
+class FieldGroupMember(Base):
+    __tablename__ = "field_group_members"
+
+    group_id = Column(
+        Integer, ForeignKey("field_groups.id", ondelete="CASCADE"), primary_key=True
+    )
+    field_id = Column(
+        Integer, ForeignKey("fields.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
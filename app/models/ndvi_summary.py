@@ -0,0 +1,63 @@
+from sqlalchemy import Column, Integer, Float, Date, DateTime, ForeignKey
+from sqlalchemy.sql import func
+
+from app.db.database import Base
+
+NDVI_STATUSES = ("Poor", "Moderate", "Healthy")
+
+# Additive columns shared by every summary table; merged with `+` on upsert
+AGGREGATE_COLUMNS = (
+    "analysis_count",
+    "area_hectares",
+    "ndvi_area_sum",
+    "poor_count",
+    "moderate_count",
+    "healthy_count",
+    "poor_hectares",
+    "moderate_hectares",
+    "healthy_hectares",
+)
+
+
+class NdviAggregate:
+    """
+    Running sums over the month's live fields. Each field counts once, with
+    its latest analysis of the month and its area, so analysis_count is the
+    number of fields analysed and the area-weighted mean NDVI is
+    ndvi_area_sum / area_hectares.
+    """
+    month = Column(Date, primary_key=True)
+
+    analysis_count = Column(Integer, nullable=False, default=0)
+    area_hectares = Column(Float, nullable=False, default=0)
+    ndvi_area_sum = Column(Float, nullable=False, default=0)
+
+    poor_count = Column(Integer, nullable=False, default=0)
+    moderate_count = Column(Integer, nullable=False, default=0)
+    healthy_count = Column(Integer, nullable=False, default=0)
+    poor_hectares = Column(Float, nullable=False, default=0)
+    moderate_hectares = Column(Float, nullable=False, default=0)
+    healthy_hectares = Column(Float, nullable=False, default=0)
+
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+
+
+class UserNdviSummary(NdviAggregate, Base):
+    __tablename__ = "user_ndvi_summaries"
+
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+
+
+class RegionNdviSummary(NdviAggregate, Base):
+    """Organization-wide rollup per 1 x 1 degree cell (floor of the centroid)."""
+    __tablename__ = "region_ndvi_summaries"
+
+    cell_lon = Column(Integer, primary_key=True)
+    cell_lat = Column(Integer, primary_key=True)
@@ -0,0 +1,37 @@
+from sqlalchemy import BigInteger, Column, DateTime, Float, ForeignKey, Index, Integer, String
+from sqlalchemy.sql import func
+
+from app.db.database import Base
+
+
+# State of the shared ("postgres") rate limiter backend. Both tables are
+# UNLOGGED: losing limiter state in a crash only resets the buckets, and
+# skipping the WAL keeps the per-request writes cheap.
+class RateLimitBucket(Base):
+    __tablename__ = "rate_limit_buckets"
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
+
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    cost_class = Column(String, primary_key=True)
+
+    tokens = Column(Float, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class RateLimitLease(Base):
+    """One in-flight request; expired leases of crashed workers are ignored."""
+
+    __tablename__ = "rate_limit_leases"
+    __table_args__ = (
+        Index("ix_rate_limit_leases_user_class", "user_id", "cost_class", "expires_at"),
+        {"prefixes": ["UNLOGGED"]},
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    user_id = Column(
+        Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    cost_class = Column(String, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
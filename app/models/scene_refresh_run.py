@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+
+from app.db.database import Base
+
+
+class SceneRefreshRun(Base):
+    __tablename__ = "scene_refresh_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Catalog items created after this instant were considered by the run
+    since = Column(DateTime, nullable=False)
+
+    started_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    finished_at = Column(DateTime, nullable=True)
+
+    status = Column(String, nullable=False, default="running")
+    scenes_processed = Column(Integer, nullable=False, default=0)
+    analyses_written = Column(Integer, nullable=False, default=0)
@@ -16,5 +16,11 @@ class User(Base):
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    # Bumped whenever one of the user's fields is created, updated or deleted
+    fields_version = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # Bumped whenever analyses of the user's fields are stored
+    analyses_version = Column(Integer, nullable=False, default=0, server_default="0")
+
     fields = relationship("Field", back_populates="user")
 
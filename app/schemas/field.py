@@ -5,3 +5,8 @@ class FieldCreate(BaseModel):
     type: str
     geometry: Any
 
+
+
+class FieldImport(BaseModel):
+    type: str
+    features: list[FieldCreate]
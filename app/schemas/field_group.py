@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+
+
+class FieldGroupCreate(BaseModel):
+    name: str
+    field_ids: list[int] = []
+
+
+class FieldGroupMembers(BaseModel):
+    field_ids: list[int]
@@ -0,0 +1,129 @@
+import numpy as np
+import shapely
+from fastapi import HTTPException
+from shapely.geometry import mapping
+
+from app.models.field import Field
+
+# Topology-preserving simplification tolerances in degrees (~1 m and ~10 m)
+SIMPLIFY_TOLERANCES = {
+    "medium": 0.00001,
+    "low": 0.0001,
+}
+SIMPLIFY_LEVELS = ("full",) + tuple(SIMPLIFY_TOLERANCES)
+
+# Stored column holding each level
+GEOMETRY_COLUMNS = {
+    "full": Field.geometry,
+    "medium": Field.geometry_medium,
+    "low": Field.geometry_low,
+}
+
+POLYGONAL_TYPES = ("Polygon", "MultiPolygon")
+
+
+# =========================
+# VALIDATION
+# =========================
+def as_multipolygon(geom):
+    """Polygonal parts of `geom` as one MultiPolygon (the stored type)."""
+    parts = [
+        part for part in shapely.get_parts(geom)
+        if part.geom_type in POLYGONAL_TYPES and not part.is_empty
+    ]
+    polygons = []
+    for part in parts:
+        polygons.extend(shapely.get_parts(part))
+
+    return shapely.MultiPolygon(polygons)
+
+
+def validate_field_geometry(geom):
+    """
+    Check a submitted Polygon or MultiPolygon and return it as a valid
+    MultiPolygon. Coordinate ranges are checked for every ring in one NumPy
+    pass; self-intersections and similar defects are repaired with
+    make_valid rather than rejected.
+    """
+    if geom.geom_type not in POLYGONAL_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail="Only Polygon and MultiPolygon geometries are supported"
+        )
+
+    coords = shapely.get_coordinates(geom)
+    if coords.size == 0:
+        raise HTTPException(status_code=400, detail="Geometry is empty")
+
+    if not (
+        np.isfinite(coords).all()
+        and (np.abs(coords[:, 0]) <= 180).all()
+        and (np.abs(coords[:, 1]) <= 90).all()
+    ):
+        raise HTTPException(
+            status_code=400,
+            detail="Coordinates must be in WGS84 (EPSG:4326)"
+        )
+
+    if not geom.is_valid:
+        geom = shapely.make_valid(geom)
+
+    geom = as_multipolygon(geom)
+    if geom.is_empty or geom.area == 0:
+        raise HTTPException(status_code=400, detail="Geometry has no area")
+
+    return geom
+
+
+def simplified_geometries(geom):
+    """Precomputed simplified versions of `geom`, keyed by level."""
+    levels = {}
+    for level, tolerance in SIMPLIFY_TOLERANCES.items():
+        simplified = as_multipolygon(geom.simplify(tolerance, preserve_topology=True))
+        levels[level] = simplified if not simplified.is_empty else geom
+
+    return levels
+
+
+def resolve_simplify_level(simplify, zoom=None):
+    """
+    Pick a level from an explicit `simplify` value or, when given, a web map
+    zoom (>=16 full detail, 13-15 medium, below that low).
+    """
+    if zoom is not None:
+        if zoom >= 16:
+            return "full"
+        if zoom >= 13:
+            return "medium"
+        return "low"
+
+    if simplify not in SIMPLIFY_LEVELS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"simplify must be one of {', '.join(SIMPLIFY_LEVELS)}",
+        )
+
+    return simplify
+
+
+def validate_precision(precision):
+    if not 0 <= precision <= 15:
+        raise HTTPException(
+            status_code=400,
+            detail="precision must be between 0 and 15",
+        )
+
+
+def geometry_to_geojson(geom, precision=None):
+    """
+    GeoJSON mapping of `geom`, optionally rounded to `precision` decimals.
+    Single-part fields are stored as MultiPolygons but returned as Polygons.
+    """
+    if geom.geom_type == "MultiPolygon" and len(geom.geoms) == 1:
+        geom = geom.geoms[0]
+
+    if precision is not None:
+        validate_precision(precision)
+        geom = shapely.transform(geom, lambda coords: np.round(coords, precision))
+
+    return mapping(geom)
@@ -0,0 +1,100 @@
+"""
+Field groups (farms, blocks) and their cached extent.
+
+A group's bbox is the extent of its live member fields. It is recomputed
+in SQL whenever membership changes or a member is reshaped or deleted, so
+group-level STAC lookups read four columns instead of aggregating members.
+"""
+from fastapi import HTTPException
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+
+from app.models.field import Field
+from app.models.field_group import FieldGroup, FieldGroupMember
+
+REFRESH_BBOX_SQL = text("""
+    UPDATE field_groups AS g
+    SET (bbox_west, bbox_south, bbox_east, bbox_north) = (
+        SELECT min(f.bbox_west), min(f.bbox_south), max(f.bbox_east), max(f.bbox_north)
+        FROM field_group_members AS m
+        JOIN fields AS f ON f.id = m.field_id AND f.deleted_at IS NULL
+        WHERE m.group_id = g.id
+    ),
+    updated_at = now()
+    WHERE g.id IN (
+        SELECT group_id FROM field_group_members WHERE field_id = :field_id
+    )
+""")
+
+
+async def refresh_group_bbox(db, group):
+    bounds = (await db.execute(
+        select(
+            func.min(Field.bbox_west),
+            func.min(Field.bbox_south),
+            func.max(Field.bbox_east),
+            func.max(Field.bbox_north),
+        )
+        .join(FieldGroupMember, FieldGroupMember.field_id == Field.id)
+        .where(FieldGroupMember.group_id == group.id, Field.deleted_at.is_(None))
+    )).one()
+
+    group.bbox_west, group.bbox_south, group.bbox_east, group.bbox_north = bounds
+
+
+async def refresh_field_groups(db, field_id):
+    """Recompute the bbox of every group containing `field_id`."""
+    await db.execute(REFRESH_BBOX_SQL, {"field_id": field_id})
+
+
+async def get_user_group(db, user_id, group_id):
+    group = await db.scalar(select(FieldGroup).where(
+        FieldGroup.id == group_id,
+        FieldGroup.user_id == user_id,
+    ))
+
+    if not group:
+        raise HTTPException(status_code=404, detail="Group not found")
+
+    return group
+
+
+async def set_group_members(db, group, user_id, field_ids):
+    """Replace the group's members with `field_ids`, all the user's live fields."""
+    field_ids = sorted(set(field_ids))
+
+    if field_ids:
+        owned = set((await db.scalars(select(Field.id).where(
+            Field.id.in_(field_ids),
+            Field.user_id == user_id,
+            Field.deleted_at.is_(None),
+        ))).all())
+        unknown = [field_id for field_id in field_ids if field_id not in owned]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail={"message": "Unknown fields", "field_ids": unknown},
+            )
+
+    await db.execute(delete(FieldGroupMember).where(
+        FieldGroupMember.group_id == group.id,
+        FieldGroupMember.field_id.not_in(field_ids),
+    ))
+    if field_ids:
+        await db.execute(
+            insert(FieldGroupMember)
+            .values([{"group_id": group.id, "field_id": field_id} for field_id in field_ids])
+            .on_conflict_do_nothing()
+        )
+
+    await refresh_group_bbox(db, group)
+
+
+def group_fields_query(group_id, *columns):
+    """SELECT `columns` of the group's live member fields, ordered by id."""
+    return (
+        select(*columns)
+        .join(FieldGroupMember, FieldGroupMember.field_id == Field.id)
+        .where(FieldGroupMember.group_id == group_id, Field.deleted_at.is_(None))
+        .order_by(Field.id)
+    )
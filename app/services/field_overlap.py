@@ -0,0 +1,144 @@
+"""
+Overlap detection between a user's fields.
+
+Overlapping fields count the same pixels twice in batch analyses and NDVI
+rollups. Single writes are checked with one query against the partial
+GiST index on (user_id, geometry); imports additionally check the uploaded
+set against itself with an in-memory STRtree. Overlaps below
+FIELD_OVERLAP_MIN_AREA_M2 (shared boundaries, digitizing slivers) are
+ignored.
+"""
+import numpy as np
+import shapely
+from fastapi import HTTPException
+from geoalchemy2 import Geography
+from sqlalchemy import bindparam, cast, func, select, text
+
+from app.core.config import settings
+from app.models.field import Field
+
+# Overlaps listed in a 409 response
+MAX_REPORTED_OVERLAPS = 20
+
+# Metres per degree of latitude (and of longitude at the equator)
+METRES_PER_DEGREE = 111320.0
+
+
+async def find_overlaps(db, user_id, geom_shape, exclude_field_id=None):
+    """[(field_id, overlap_m2)] of the user's live fields overlapping `geom_shape`."""
+    geom = func.ST_GeomFromText(bindparam("wkt", geom_shape.wkt), 4326)
+    overlap_m2 = func.ST_Area(
+        cast(func.ST_Intersection(Field.geometry, geom), Geography(srid=4326))
+    ).label("overlap_m2")
+
+    query = (
+        select(Field.id, overlap_m2)
+        .where(
+            Field.user_id == user_id,
+            Field.deleted_at.is_(None),
+            func.ST_Intersects(Field.geometry, geom),
+            overlap_m2 >= settings.FIELD_OVERLAP_MIN_AREA_M2,
+        )
+        .order_by(overlap_m2.desc())
+        .limit(MAX_REPORTED_OVERLAPS)
+    )
+    if exclude_field_id is not None:
+        query = query.where(Field.id != exclude_field_id)
+
+    return (await db.execute(query)).all()
+
+
+def overlap_conflict(overlaps):
+    return HTTPException(
+        status_code=409,
+        detail={
+            "message": "Geometry overlaps existing fields",
+            "overlaps": [
+                {"field_id": field_id, "overlap_m2": round(area, 1)}
+                for field_id, area in overlaps
+            ],
+        },
+    )
+
+
+# =========================
+# BULK IMPORTS
+# =========================
+def find_overlaps_within(shapes):
+    """
+    [(i, j, overlap_m2)] for pairs of `shapes` (EPSG:4326) that overlap each
+    other, i < j. Candidate pairs come from one STRtree query; areas use an
+    equirectangular approximation at the overlap's latitude, which is well
+    within the threshold's precision at field scale.
+    """
+    if len(shapes) < 2:
+        return []
+
+    geoms = np.asarray(shapes, dtype=object)
+    tree = shapely.STRtree(geoms)
+    left, right = tree.query(geoms, predicate="intersects")
+
+    pairs = left < right
+    left, right = left[pairs], right[pairs]
+    if left.size == 0:
+        return []
+
+    intersections = shapely.intersection(geoms[left], geoms[right])
+    latitudes = shapely.get_y(shapely.centroid(intersections))
+    overlap_m2 = (
+        shapely.area(intersections)
+        * METRES_PER_DEGREE ** 2
+        * np.cos(np.radians(np.nan_to_num(latitudes)))
+    )
+
+    keep = overlap_m2 >= settings.FIELD_OVERLAP_MIN_AREA_M2
+    return [
+        (int(i), int(j), float(area))
+        for i, j, area in zip(left[keep], right[keep], overlap_m2[keep])
+    ]
+
+
+IMPORT_OVERLAPS_SQL = text("""
+    SELECT upload.idx - 1, f.id, overlap.m2
+    FROM unnest(CAST(:wkts AS text[])) WITH ORDINALITY AS upload(wkt, idx)
+    CROSS JOIN LATERAL (SELECT ST_GeomFromText(upload.wkt, 4326) AS geom) AS g
+    JOIN fields f
+      ON f.user_id = :user_id
+     AND f.deleted_at IS NULL
+     AND ST_Intersects(f.geometry, g.geom)
+    CROSS JOIN LATERAL (
+        SELECT ST_Area(ST_Intersection(f.geometry, g.geom)::geography) AS m2
+    ) AS overlap
+    WHERE overlap.m2 >= :min_area
+    ORDER BY upload.idx, overlap.m2 DESC
+    LIMIT :limit
+""")
+
+
+async def find_import_overlaps(db, user_id, shapes):
+    """[(index in `shapes`, field_id, overlap_m2)] against the user's stored fields."""
+    result = await db.execute(IMPORT_OVERLAPS_SQL, {
+        "wkts": [geom.wkt for geom in shapes],
+        "user_id": user_id,
+        "min_area": settings.FIELD_OVERLAP_MIN_AREA_M2,
+        "limit": MAX_REPORTED_OVERLAPS,
+    })
+
+    return [(index, field_id, area) for index, field_id, area in result]
+
+
+def import_conflict(within, existing):
+    return HTTPException(
+        status_code=409,
+        detail={
+            "message": "Imported geometries overlap each other or existing fields",
+            "within_upload": [
+                {"features": [i, j], "overlap_m2": round(area, 1)}
+                for i, j, area in within[:MAX_REPORTED_OVERLAPS]
+            ],
+            "existing": [
+                {"feature": index, "field_id": field_id, "overlap_m2": round(area, 1)}
+                for index, field_id, area in existing
+            ],
+        },
+    )
@@ -0,0 +1,25 @@
+"""
+Per-user field collection version.
+
+users.fields_version changes with every write to one of the user's fields
+or groups; it is part of the collection ETags and its row lock orders the
+user's writes.
+"""
+from sqlalchemy import update
+
+from app.models.user import User
+
+
+async def bump_fields_version(db, user_id):
+    """
+    Bump the user's collection version. Call it before flushing the field
+    write: the row lock it takes serializes the user's writes, so versions
+    drawn from fields_version_seq commit in order and the change feed
+    cursor never skips a change.
+    """
+    await db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(fields_version=User.fields_version + 1)
+        .execution_options(synchronize_session=False)
+    )
@@ -20,3 +20,17 @@ def get_recommendation(ndvi_status: str) -> str:
         return "Monitor crop stress"
     else:
         return "Immediate intervention required"
+
+
+def ndvi_status_from_value(ndvi_mean: float) -> str:
+    """
+    Status of a measured mean NDVI (sparse or stressed vegetation below 0.2,
+    dense healthy canopy from 0.5)
+    """
+
+    if ndvi_mean < 0.2:
+        return "Poor"
+    elif ndvi_mean < 0.5:
+        return "Moderate"
+    else:
+        return "Healthy"
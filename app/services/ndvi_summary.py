@@ -0,0 +1,258 @@
+"""
+Incremental NDVI rollups.
+
+`record_analyses` is the single write path for FieldAnalysis rows: it stores
+new results and updates the per-user and per-region monthly summaries in the
+same transaction. Reading a summary is then one primary key lookup however
+many analyses it covers.
+
+Each live field contributes once per month, with its latest analysis of the
+month weighted by its current area. When a newer analysis replaces that one,
+or the field is reshaped or deleted, the old contribution is subtracted and
+the new one added, so the summaries never need rebuilding.
+"""
+import math
+from collections import defaultdict
+from datetime import date
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import distinct_on, insert
+
+from app.models.field import Field
+from app.models.field_analysis import FieldAnalysis, ensure_partitions
+from app.models.ndvi_summary import (
+    AGGREGATE_COLUMNS,
+    NDVI_STATUSES,
+    RegionNdviSummary,
+    UserNdviSummary,
+)
+from app.models.user import User
+from app.services.ndvi_engine import ndvi_status_from_value
+
+
+def month_of(moment):
+    return date(moment.year, moment.month, 1)
+
+
+def _empty_aggregate():
+    return dict.fromkeys(AGGREGATE_COLUMNS, 0)
+
+
+def _next_month(month):
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def _add(aggregate, ndvi_mean, area, sign):
+    status = ndvi_status_from_value(ndvi_mean).lower()
+
+    aggregate["analysis_count"] += sign
+    aggregate["area_hectares"] += sign * area
+    aggregate["ndvi_area_sum"] += sign * ndvi_mean * area
+    aggregate[f"{status}_count"] += sign
+    aggregate[f"{status}_hectares"] += sign * area
+
+
+def _upsert(db, model, key_columns, aggregates):
+    if not aggregates:
+        return
+
+    # Sorted keys give concurrent writers the same row lock order
+    rows = [
+        {**dict(zip(key_columns, key)), **aggregate}
+        for key, aggregate in sorted(aggregates.items())
+    ]
+    statement = insert(model).values(rows)
+    table = model.__table__
+
+    db.execute(statement.on_conflict_do_update(
+        index_elements=list(key_columns),
+        set_={
+            **{
+                column: table.c[column] + statement.excluded[column]
+                for column in AGGREGATE_COLUMNS
+            },
+            "updated_at": func.now(),
+        },
+    ))
+
+
+class _Deltas:
+    """Pending changes to the user and region summaries."""
+
+    def __init__(self):
+        self.by_user = defaultdict(_empty_aggregate)
+        self.by_region = defaultdict(_empty_aggregate)
+
+    def add(self, field, month, ndvi_mean, sign=1):
+        cell = (math.floor(field.lon), math.floor(field.lat))
+
+        _add(self.by_user[(field.user_id, month)], ndvi_mean, field.area_hectares, sign)
+        _add(self.by_region[(*cell, month)], ndvi_mean, field.area_hectares, sign)
+
+    def apply(self, db):
+        _upsert(db, UserNdviSummary, ("user_id", "month"), self.by_user)
+        _upsert(
+            db, RegionNdviSummary, ("cell_lon", "cell_lat", "month"), self.by_region
+        )
+
+
+def _live_fields(db, field_ids):
+    """
+    Live fields by id, with what their contribution depends on. The rows are
+    locked FOR NO KEY UPDATE (in id order), which conflicts with itself, so
+    concurrent writers to the same field's contribution apply their deltas
+    one after the other. Plain inserts referencing the field aren't blocked.
+    """
+    rows = db.execute(
+        select(
+            Field.id,
+            Field.user_id,
+            Field.area_hectares,
+            func.ST_X(Field.centroid).label("lon"),
+            func.ST_Y(Field.centroid).label("lat"),
+        )
+        .where(Field.id.in_(field_ids), Field.deleted_at.is_(None))
+        .order_by(Field.id)
+        # key_share=True renders FOR NO KEY UPDATE, the lock UPDATE takes
+        .with_for_update(key_share=True)
+    )
+    return {row.id: row for row in rows}
+
+
+def _latest_in_month(db, field_ids, months=None):
+    """{(field_id, month): row} of each field's latest analysis per month."""
+    month = func.date_trunc("month", FieldAnalysis.scene_date)
+    query = (
+        select(FieldAnalysis.field_id, FieldAnalysis.ndvi_mean, FieldAnalysis.scene_date)
+        .where(FieldAnalysis.field_id.in_(field_ids))
+        .ext(distinct_on(FieldAnalysis.field_id, month))
+        .order_by(FieldAnalysis.field_id, month, FieldAnalysis.scene_date.desc())
+    )
+    if months:
+        # scene_date bounds let Postgres prune to the matching yearly partitions
+        query = query.where(
+            FieldAnalysis.scene_date >= min(months),
+            FieldAnalysis.scene_date < _next_month(max(months)),
+        )
+
+    return {(row.field_id, month_of(row.scene_date)): row for row in db.execute(query)}
+
+
+def record_analyses(db, analyses):
+    """
+    Insert `analyses` (dicts with field_id, ndvi_mean, scene_date and
+    created_at) and update the summaries. Results already stored for the same
+    field and scene date are skipped. Returns the number of rows inserted;
+    the caller commits.
+    """
+    if not analyses:
+        return 0
+
+    ensure_partitions(db, [row["scene_date"].year for row in analyses])
+
+    # Replica reads of the owners' analyses wait for this write. The user
+    # rows are locked before the field rows, like field writes lock them,
+    # and in id order so writers spanning several users can't deadlock
+    field_ids = {row["field_id"] for row in analyses}
+    user_ids = db.scalars(
+        select(User.id)
+        .where(User.id.in_(select(Field.user_id).where(Field.id.in_(field_ids))))
+        .order_by(User.id)
+        .with_for_update()
+    ).all()
+    db.execute(
+        update(User)
+        .where(User.id.in_(user_ids))
+        .values(analyses_version=User.analyses_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+    fields = _live_fields(db, field_ids)
+    previous = {}
+    if fields:
+        previous = _latest_in_month(
+            db, fields, {month_of(row["scene_date"]) for row in analyses}
+        )
+
+    inserted = db.execute(
+        insert(FieldAnalysis)
+        .values(analyses)
+        .on_conflict_do_nothing(index_elements=["field_id", "scene_date"])
+        .returning(FieldAnalysis.field_id, FieldAnalysis.ndvi_mean, FieldAnalysis.scene_date)
+    ).all()
+
+    latest = {}
+    for row in inserted:
+        if row.field_id not in fields:
+            continue
+
+        key = (row.field_id, month_of(row.scene_date))
+        current = latest.get(key, previous.get(key))
+        if current is None or row.scene_date > current.scene_date:
+            latest[key] = row
+
+    deltas = _Deltas()
+    for (field_id, month), row in latest.items():
+        field = fields[field_id]
+        replaced = previous.get((field_id, month))
+        if replaced is not None:
+            deltas.add(field, month, replaced.ndvi_mean, sign=-1)
+        deltas.add(field, month, row.ndvi_mean)
+    deltas.apply(db)
+
+    return len(inserted)
+
+
+def _shift_fields(db, field_ids, sign):
+    fields = _live_fields(db, field_ids)
+    if not fields:
+        return
+
+    deltas = _Deltas()
+    for (field_id, month), row in _latest_in_month(db, fields).items():
+        deltas.add(fields[field_id], month, row.ndvi_mean, sign)
+    deltas.apply(db)
+
+
+def withdraw_fields(db, field_ids):
+    """
+    Subtract the fields' contributions from every month's summaries. Call it
+    before a write that changes their area or centroid, or deletes them.
+    """
+    _shift_fields(db, field_ids, -1)
+
+
+def contribute_fields(db, field_ids):
+    """Add the fields' contributions back after such a write has been flushed."""
+    _shift_fields(db, field_ids, 1)
+
+
+def summary_to_dict(summary):
+    """API shape of a summary row; None renders as an empty month."""
+    if summary is None:
+        return {
+            "analysis_count": 0,
+            "area_hectares": 0,
+            "mean_ndvi": None,
+            "status": {
+                status: {"count": 0, "hectares": 0} for status in NDVI_STATUSES
+            },
+        }
+
+    return {
+        "analysis_count": summary.analysis_count,
+        "area_hectares": round(summary.area_hectares, 2),
+        "mean_ndvi": (
+            # The count is exact; the float sums may keep rounding residue
+            # after every contribution has been withdrawn
+            round(summary.ndvi_area_sum / summary.area_hectares, 4)
+            if summary.analysis_count else None
+        ),
+        "status": {
+            status: {
+                "count": getattr(summary, f"{status.lower()}_count"),
+                "hectares": round(getattr(summary, f"{status.lower()}_hectares"), 2),
+            }
+            for status in NDVI_STATUSES
+        },
+    }
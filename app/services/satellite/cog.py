@@ -0,0 +1,39 @@
+"""
+Cloud Optimized GeoTIFF output, as written by the scene mirror and the
+benchmark fixtures: 512 px tiles, DEFLATE compression and internal
+overviews, laid out like the Sentinel-2 COGs they stand in for.
+"""
+import os
+
+import rasterio
+import rasterio.shutil
+
+COG_BLOCK_SIZE = 512
+
+
+def write_cog(path, data, crs, transform, nodata=0):
+    """Write the 2-D array `data` as a single band COG at `path`."""
+    profile = {
+        "driver": "GTiff",
+        "width": data.shape[1],
+        "height": data.shape[0],
+        "count": 1,
+        "dtype": data.dtype,
+        "crs": crs,
+        "transform": transform,
+        "nodata": nodata,
+        "tiled": True,
+        "blockxsize": COG_BLOCK_SIZE,
+        "blockysize": COG_BLOCK_SIZE,
+    }
+
+    # The COG driver can't write incrementally, so it copies a tiled GTiff
+    tmp_path = path + ".tmp.tif"
+    with rasterio.open(tmp_path, "w", **profile) as dst:
+        dst.write(data, 1)
+
+    rasterio.shutil.copy(
+        tmp_path, path, driver="COG",
+        COMPRESS="DEFLATE", BLOCKSIZE=COG_BLOCK_SIZE, OVERVIEWS="AUTO",
+    )
+    os.remove(tmp_path)
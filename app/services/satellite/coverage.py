@@ -0,0 +1,46 @@
+"""Where the registered fields are, for jobs that only fetch scenes over them."""
+from sqlalchemy import func
+
+from app.models.field import Field
+
+
+def fields_extent(db, user_id=None):
+    """
+    [west, south, east, north] around every live field (of `user_id` if
+    given), from the stored bbox columns. None when there are no fields.
+    """
+    query = db.query(
+        func.min(Field.bbox_west),
+        func.min(Field.bbox_south),
+        func.max(Field.bbox_east),
+        func.max(Field.bbox_north),
+    ).filter(Field.deleted_at.is_(None))
+    if user_id is not None:
+        query = query.filter(Field.user_id == user_id)
+
+    bounds = query.one()
+    return list(bounds) if bounds[0] is not None else None
+
+
+def fields_extents(db, cell_degrees=1):
+    """
+    fields_extent per populated `cell_degrees` grid cell (by field
+    centroid). Searching these instead of one box around everything keeps
+    users far apart from making every search page through all the tiles
+    in between.
+    """
+    rows = (
+        db.query(
+            func.min(Field.bbox_west),
+            func.min(Field.bbox_south),
+            func.max(Field.bbox_east),
+            func.max(Field.bbox_north),
+        )
+        .filter(Field.deleted_at.is_(None))
+        .group_by(
+            func.floor(func.ST_X(Field.centroid) / cell_degrees),
+            func.floor(func.ST_Y(Field.centroid) / cell_degrees),
+        )
+        .all()
+    )
+    return [list(bounds) for bounds in rows]
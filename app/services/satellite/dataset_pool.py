@@ -0,0 +1,131 @@
+"""
+Pool of open rasterio datasets, keyed by href.
+
+Opening a COG costs HTTP requests for its header and IFDs. When many fields
+are analyzed against the same scene, handing out an already open dataset pays
+that once per scene instead of once per field. A handle is used by one thread
+at a time (GDAL datasets are not thread-safe): concurrent analyses of the
+same scene each get their own handle, and handles go back to the pool when
+released. Idle handles are closed least recently used first when the pool is
+full, and after DATASET_POOL_IDLE_SECONDS without use.
+"""
+import atexit
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+
+import rasterio
+from rasterio.errors import RasterioError
+
+from app.core.config import settings
+from app.core.metrics import DATASET_POOL_LOOKUPS
+
+_IdleHandle = namedtuple("_IdleHandle", ["href", "dataset", "released_at"])
+
+
+class DatasetPool:
+    def __init__(self, max_handles, idle_seconds):
+        self.max_handles = max_handles
+        self.idle_seconds = idle_seconds
+        # id(dataset) -> _IdleHandle, least recently released first
+        self._idle = OrderedDict()
+        self._in_use = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def acquire(self, href):
+        """
+        Yield an open dataset for `href`, exclusively for the caller. A handle
+        that failed with a GDAL error is closed instead of being pooled.
+        """
+        dataset = self._checkout(href)
+        try:
+            yield dataset
+        except RasterioError:
+            self._discard(dataset)
+            raise
+        except BaseException:
+            self._release(href, dataset)
+            raise
+        else:
+            self._release(href, dataset)
+
+    def _checkout(self, href):
+        dataset = None
+
+        with self._lock:
+            expired = self._expire(time.monotonic())
+
+            for key in reversed(self._idle):
+                if self._idle[key].href == href:
+                    dataset = self._idle.pop(key).dataset
+                    break
+
+            self._in_use += 1
+
+        _close(expired)
+
+        if dataset is not None:
+            DATASET_POOL_LOOKUPS.labels(result="hit").inc()
+            return dataset
+
+        DATASET_POOL_LOOKUPS.labels(result="miss").inc()
+        try:
+            return rasterio.open(href)
+        except BaseException:
+            with self._lock:
+                self._in_use -= 1
+            raise
+
+    def _release(self, href, dataset):
+        evicted = []
+
+        with self._lock:
+            self._in_use -= 1
+            self._idle[id(dataset)] = _IdleHandle(href, dataset, time.monotonic())
+
+            while self._idle and len(self._idle) + self._in_use > self.max_handles:
+                _, handle = self._idle.popitem(last=False)
+                evicted.append(handle)
+
+        _close(evicted)
+
+    def _discard(self, dataset):
+        with self._lock:
+            self._in_use -= 1
+
+        dataset.close()
+
+    def _expire(self, now):
+        expired = []
+        while self._idle:
+            key, handle = next(iter(self._idle.items()))
+            if now - handle.released_at < self.idle_seconds:
+                break
+            expired.append(self._idle.pop(key))
+
+        return expired
+
+    def idle_count(self):
+        with self._lock:
+            return len(self._idle)
+
+    def close_all(self):
+        with self._lock:
+            handles = list(self._idle.values())
+            self._idle.clear()
+
+        _close(handles)
+
+
+def _close(handles):
+    # Outside the pool lock: closing can take a moment
+    for handle in handles:
+        handle.dataset.close()
+
+
+dataset_pool = DatasetPool(
+    settings.DATASET_POOL_MAX_HANDLES, settings.DATASET_POOL_IDLE_SECONDS
+)
+atexit.register(dataset_pool.close_all)
@@ -0,0 +1,149 @@
+"""
+GDAL configuration for satellite reads.
+
+Every rasterio open/read in the satellite pipeline runs inside `gdal_env()`,
+a rasterio.Env tuned for COGs over HTTP: no directory listing on open, the
+header fetched in one request, consecutive ranges merged, HTTP/2 multiplexing
+and a bounded block and VSI cache.
+
+`track_http()` counts the HTTP requests and bytes GDAL issues while it is
+active. The counts come from GDAL's VSICURL debug messages, which rasterio
+forwards to Python logging; they are consumed by a logging filter and never
+reach the application log.
+"""
+import logging
+import os
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from app.core.config import settings
+from app.core.metrics import GDAL_HTTP_BYTES, GDAL_HTTP_REQUESTS
+
+# The block cache size is set once per process, before GDAL sizes its cache.
+# Setting it on an Env makes rasterio resize, and so flush, the cache on
+# every enter/exit, which re-downloads blocks between the two band reads.
+os.environ.setdefault("GDAL_CACHEMAX", str(settings.GDAL_CACHEMAX_MB))
+
+import rasterio  # noqa: E402
+
+# rasterio loggers that relay GDAL debug messages
+GDAL_LOGGERS = ("rasterio._env", "rasterio._err")
+
+_DOWNLOAD = re.compile(r"VSICURL: Downloading ([\d\-,]+)")
+_RANGE = re.compile(r"(\d+)-(\d+)")
+_FILE_SIZE = "VSICURL: GetFileSize("
+
+
+def gdal_options():
+    options = {
+        "GDAL_DISABLE_READDIR_ON_OPEN": "EMPTY_DIR",
+        "CPL_VSIL_CURL_ALLOWED_EXTENSIONS": settings.GDAL_ALLOWED_EXTENSIONS,
+        "GDAL_INGESTED_BYTES_AT_OPEN": 32768,
+        "GDAL_HTTP_MERGE_CONSECUTIVE_RANGES": "YES",
+        "GDAL_HTTP_MAX_RETRY": settings.GDAL_HTTP_MAX_RETRY,
+        "GDAL_HTTP_RETRY_DELAY": 0.5,
+        "VSI_CACHE": "TRUE",
+        "VSI_CACHE_SIZE": settings.GDAL_VSI_CACHE_SIZE_MB * 1024 * 1024,
+    }
+
+    if settings.GDAL_HTTP_MULTIPLEX:
+        options["GDAL_HTTP_MULTIPLEX"] = "YES"
+        options["GDAL_HTTP_VERSION"] = 2
+
+    if settings.GDAL_HTTP_STATS:
+        # Only the VSICURL category, not GDAL-wide debug output
+        options["CPL_DEBUG"] = "VSICURL"
+
+    return options
+
+
+def gdal_env():
+    return rasterio.Env(**gdal_options())
+
+
+# =========================
+# HTTP REQUEST STATISTICS
+# =========================
+class HttpStats:
+    __slots__ = ("requests", "bytes")
+
+    def __init__(self):
+        self.requests = 0
+        self.bytes = 0
+
+    def as_dict(self):
+        return {"requests": self.requests, "bytes": self.bytes}
+
+
+# Every active track_http() context, outermost first
+_http_stats: ContextVar[tuple] = ContextVar("gdal_http_stats", default=())
+
+
+class _VsiCurlFilter(logging.Filter):
+    """
+    Count VSICURL request messages and swallow them. Other records are let
+    through only if the logger was configured to show them before it was
+    lowered to DEBUG for this filter.
+    """
+
+    def __init__(self, passthrough_level):
+        super().__init__()
+        self.passthrough_level = passthrough_level
+
+    def filter(self, record):
+        message = record.getMessage()
+
+        if "VSICURL:" not in message:
+            return record.levelno >= self.passthrough_level
+
+        download = _DOWNLOAD.search(message)
+        if download is not None:
+            size = sum(
+                int(end) - int(start) + 1
+                for start, end in _RANGE.findall(download.group(1))
+            )
+            GDAL_HTTP_BYTES.inc(size)
+            _count(1, size)
+        elif _FILE_SIZE in message:
+            _count(1, 0)
+
+        return False
+
+
+def _count(requests, size):
+    for stats in _http_stats.get():
+        stats.requests += requests
+        stats.bytes += size
+
+
+_installed = False
+
+
+def install_http_stats():
+    """Attach the counting filter to rasterio's GDAL loggers (idempotent)."""
+    global _installed
+    if _installed or not settings.GDAL_HTTP_STATS:
+        return
+
+    for name in GDAL_LOGGERS:
+        logger = logging.getLogger(name)
+        logger.addFilter(_VsiCurlFilter(logger.getEffectiveLevel()))
+        logger.setLevel(logging.DEBUG)
+
+    _installed = True
+
+
+@contextmanager
+def track_http(operation):
+    """Collect GDAL HTTP requests issued in this context into HttpStats."""
+    install_http_stats()
+
+    stats = HttpStats()
+    token = _http_stats.set(_http_stats.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _http_stats.reset(token)
+        if settings.GDAL_HTTP_STATS:
+            GDAL_HTTP_REQUESTS.labels(operation=operation).observe(stats.requests)
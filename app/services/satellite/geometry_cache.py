@@ -0,0 +1,109 @@
+"""
+Per-process cache of field geometries projected to a scene CRS, together
+with their rasterized pixel masks.
+
+Sentinel-2 tiles of one UTM zone share a common 10 m pixel grid, so a
+field's projected polygon and its mask are reusable across every scene of
+the zone. Entries are keyed by (field_id, geometry version, CRS, grid); the
+geometry version is a digest of the stored WKB, so a stale entry can never
+be served even by a process that missed an invalidation.
+"""
+import hashlib
+import math
+import threading
+from collections import OrderedDict, namedtuple
+
+from affine import Affine
+from geoalchemy2.shape import to_shape
+from rasterio.features import geometry_mask
+from rasterio.warp import transform_geom
+from shapely.geometry import mapping, shape
+
+from app.core.config import settings
+
+# Projected geometry plus its mask (True inside the field) on a grid-aligned
+# window whose upper-left corner and pixel size are given by `transform`
+FieldRaster = namedtuple("FieldRaster", ["geometry", "transform", "mask"])
+
+
+def geometry_version(geometry):
+    return hashlib.blake2b(bytes(geometry.data), digest_size=8).hexdigest()
+
+
+def _grid_of(transform):
+    res_x, res_y = transform.a, -transform.e
+    return (res_x, res_y, transform.c % res_x, transform.f % res_y)
+
+
+def _rasterize(projected, grid):
+    res_x, res_y, origin_x, origin_y = grid
+    min_x, min_y, max_x, max_y = projected.bounds
+
+    left = origin_x + math.floor((min_x - origin_x) / res_x) * res_x
+    top = origin_y + math.ceil((max_y - origin_y) / res_y) * res_y
+    width = max(math.ceil((max_x - left) / res_x), 1)
+    height = max(math.ceil((top - min_y) / res_y), 1)
+
+    transform = Affine(res_x, 0.0, left, 0.0, -res_y, top)
+    # Every part of a MultiPolygon is burned and holes are left out
+    pixel_mask = geometry_mask(
+        [mapping(projected)],
+        out_shape=(height, width),
+        transform=transform,
+        invert=True,
+    )
+
+    return FieldRaster(projected, transform, pixel_mask)
+
+
+class GeometryCache:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def field_raster(self, field_id, geometry, crs, transform):
+        """
+        Return the FieldRaster of `geometry` (a WKBElement in EPSG:4326) on
+        the pixel grid of a dataset with the given `crs` and `transform`.
+        """
+        grid = _grid_of(transform)
+        key = (field_id, geometry_version(geometry), crs.to_string(), grid)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        projected = shape(
+            transform_geom("EPSG:4326", crs, mapping(to_shape(geometry)))
+        )
+        entry = _rasterize(projected, grid)
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = entry
+                self._bytes += entry.mask.nbytes
+                self._evict()
+
+        return entry
+
+    def invalidate(self, field_id):
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == field_id]:
+                self._bytes -= self._entries.pop(key).mask.nbytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.mask.nbytes
+
+
+geometry_cache = GeometryCache(settings.GEOMETRY_CACHE_MAX_BYTES)
@@ -1,23 +1,247 @@
-import rasterio
 import numpy as np
-from rasterio.mask import mask
-from shapely.geometry import mapping
+from affine import Affine
+from rasterio.windows import Window
 
+from app.core.config import settings
+from app.core.metrics import BAND_READ_BYTES, observe_stage
+from app.services.satellite.dataset_pool import dataset_pool
+from app.services.satellite.gdal_env import gdal_env, track_http
+from app.services.satellite.geometry_cache import geometry_cache
+from app.services.satellite.raster_pool import run_raster_task
+from app.services.satellite.zonal_stats import ZonalStats, ndvi_values
 
-def compute_ndvi(red_url, nir_url, geometry):
-    with rasterio.open(red_url) as red_src:
-        red, _ = mask(red_src, [mapping(geometry)], crop=True)
 
-    with rasterio.open(nir_url) as nir_src:
-        nir, _ = mask(nir_src, [mapping(geometry)], crop=True)
+# Quick-look resolutions in metres; coarser ones are read from the COG's
+# internal overviews (2x, 4x, 8x of the 10 m bands)
+RESOLUTIONS = (10, 20, 40, 80)
 
+
+def compute_ndvi(red_url, nir_url, field_id, geometry, resolution=None):
+    # Pooled handles: a scene's headers are fetched once, not once per field
+    with gdal_env(), track_http("field_ndvi"):
+        with dataset_pool.acquire(red_url) as red_src, dataset_pool.acquire(nir_url) as nir_src:
+            return compute_ndvi_from_datasets(
+                red_src, nir_src, field_id, geometry, resolution
+            )
+
+
+def compute_ndvi_batch(red_url, nir_url, fields, resolution=None):
+    """
+    {field_id: mean NDVI} for many (field_id, geometry) pairs of one scene,
+    opening each band once. Fields outside the raster map to None.
+    """
+    results = {}
+
+    with gdal_env(), track_http("field_ndvi_batch"):
+        with dataset_pool.acquire(red_url) as red_src, dataset_pool.acquire(nir_url) as nir_src:
+            for field_id, geometry in fields:
+                try:
+                    results[field_id] = compute_ndvi_from_datasets(
+                        red_src, nir_src, field_id, geometry, resolution
+                    )
+                except ValueError:
+                    results[field_id] = None
+
+    return results
+
+
+def compute_ndvi_stats(red_url, nir_url, field_id, geometry, resolution=None):
+    """Streamed NDVI statistics (mean, std, min/max, percentiles) of a field."""
+    with gdal_env(), track_http("field_ndvi_stats"):
+        with dataset_pool.acquire(red_url) as red_src, dataset_pool.acquire(nir_url) as nir_src:
+            field_raster = geometry_cache.field_raster(
+                field_id, geometry, red_src.crs, analysis_transform(red_src, resolution)
+            )
+            return stream_field_stats(red_src, nir_src, field_raster).as_dict()
+
+
+def compute_ndvi_mosaic(field_id, parts):
+    """
+    Mean NDVI of a field split across scenes of one date. `parts` are
+    (scene, piece) pairs whose pieces (EPSG:4326 WKB) partition the field;
+    each piece is read from its own scene and the pieces' statistics are
+    merged, so no pixel counts twice. Raises ValueError if a piece misses
+    its raster.
+    """
+    stats = ZonalStats()
+
+    with gdal_env(), track_http("field_ndvi_mosaic"):
+        for scene, piece in parts:
+            with dataset_pool.acquire(scene["red"]) as red_src, dataset_pool.acquire(scene["nir"]) as nir_src:
+                field_raster = geometry_cache.field_raster(
+                    field_id, piece, red_src.crs, red_src.transform
+                )
+                stats.merge(stream_field_stats(red_src, nir_src, field_raster))
+
+    return round(stats.mean, 4) if stats.count else float("nan")
+
+
+def analysis_transform(src, resolution=None):
+    """
+    Pixel grid of an analysis at `resolution` metres: the dataset's own grid,
+    or one scaled by an integer factor with the same origin, which is how
+    the COG overviews are laid out.
+    """
+    if resolution is None:
+        return src.transform
+
+    factor = max(round(resolution / src.res[0]), 1)
+
+    return src.transform * Affine.scale(factor)
+
+
+def compute_ndvi_from_datasets(red_src, nir_src, field_id, geometry, resolution=None):
+    """
+    Mean NDVI of a field from already opened red/NIR datasets, so callers
+    processing many fields against one scene only open each band once.
+
+    `geometry` is the field's stored EPSG:4326 WKB; its projection to the
+    scene CRS and pixel mask come from the geometry cache. A coarser
+    `resolution` (metres) reads the bands' overviews for a fast
+    approximation.
+    """
+    with observe_stage("field_geometry"):
+        # The cache key includes the grid, so each resolution has its own mask
+        field_raster = geometry_cache.field_raster(
+            field_id, geometry, red_src.crs, analysis_transform(red_src, resolution)
+        )
+
+    # Large fields are streamed block by block instead of read whole
+    if field_raster.mask.size >= settings.ZONAL_STREAM_MIN_PIXELS:
+        stats = stream_field_stats(red_src, nir_src, field_raster)
+        return round(stats.mean, 4) if stats.count else float("nan")
+
+    red = read_field_window(red_src, field_raster)
+    nir = read_field_window(nir_src, field_raster)
+
+    with observe_stage("ndvi_compute"):
+        ndvi_mean, _ = run_raster_task(ndvi_mean_of, red, nir)
+
+    return ndvi_mean
+
+
+def _field_origin(src, field_raster):
+    """Pixel offset of the field grid in `src` and the grid's scale factor."""
+    col_off, row_off = ~src.transform * (
+        field_raster.transform.c, field_raster.transform.f
+    )
+    factor = round(field_raster.transform.a / src.transform.a)
+
+    height, width = field_raster.mask.shape
+    if (
+        col_off >= src.width or row_off >= src.height
+        or col_off + width * factor <= 0 or row_off + height * factor <= 0
+    ):
+        raise ValueError("Input shapes do not overlap raster.")
+
+    return round(col_off), round(row_off), factor
+
+
+def _read_block(src, origin, rows, cols):
+    """Read band 1 for the field grid's `rows` x `cols` slices."""
+    col_off, row_off, factor = origin
+    window = Window(
+        col_off + cols.start * factor,
+        row_off + rows.start * factor,
+        (cols.stop - cols.start) * factor,
+        (rows.stop - rows.start) * factor,
+    )
+
+    inside = (
+        window.col_off >= 0 and window.row_off >= 0
+        and window.col_off + window.width <= src.width
+        and window.row_off + window.height <= src.height
+    )
+    # Boundless reads go through a VRT, so only use them on scene edges
+    with observe_stage("band_read"):
+        data = src.read(
+            1,
+            window=window,
+            out_shape=(rows.stop - rows.start, cols.stop - cols.start),
+            boundless=not inside,
+            fill_value=0,
+        )
+    BAND_READ_BYTES.inc(data.nbytes)
+
+    return data
+
+
+def read_field_window(src, field_raster):
+    """
+    Read band 1 over the field's grid-aligned window, zeroing (nodata)
+    pixels outside the field. Raises ValueError if the field misses the
+    raster, like rasterio.mask does.
+
+    When the field grid is coarser than the dataset, the window is read
+    into the field grid's shape, which GDAL serves from the matching
+    overview instead of decoding full resolution blocks.
+    """
+    height, width = field_raster.mask.shape
+    data = _read_block(
+        src, _field_origin(src, field_raster), slice(0, height), slice(0, width)
+    )
+
+    data[~field_raster.mask] = 0
+
+    return data
+
+
+def field_blocks(src, field_raster):
+    """
+    (rows, cols) slices of the field grid, cut along the dataset's internal
+    tile boundaries (overview tiles for coarser grids) so every tile is
+    decoded once.
+    """
+    col_off, row_off, factor = _field_origin(src, field_raster)
+    block_height, block_width = src.block_shapes[0]
+    height, width = field_raster.mask.shape
+
+    # Field grid origin in pixels of the (overview) level being read
+    top, left = row_off // factor, col_off // factor
+
+    for block_top in range(top - top % block_height, top + height, block_height):
+        rows = slice(
+            max(block_top, top) - top,
+            min(block_top + block_height, top + height) - top,
+        )
+        for block_left in range(left - left % block_width, left + width, block_width):
+            cols = slice(
+                max(block_left, left) - left,
+                min(block_left + block_width, left + width) - left,
+            )
+            yield rows, cols
+
+
+def stream_field_stats(red_src, nir_src, field_raster):
+    """
+    ZonalStats of the field's NDVI, read one tile-aligned block at a time,
+    so memory use is bounded by the block size rather than the field's.
+    Blocks the field does not touch are never read.
+    """
+    origin = _field_origin(red_src, field_raster)
+    stats = ZonalStats()
+
+    for rows, cols in field_blocks(red_src, field_raster):
+        inside = field_raster.mask[rows, cols]
+        if not inside.any():
+            continue
+
+        red = _read_block(red_src, origin, rows, cols)
+        nir = _read_block(nir_src, origin, rows, cols)
+
+        with observe_stage("ndvi_compute"):
+            stats.update(ndvi_values(red[inside], nir[inside]))
+
+    return stats
+
+
+def ndvi_mean_of(red, nir):
     red = red.astype("float32")
     nir = nir.astype("float32")
 
-    np.seterr(divide="ignore", invalid="ignore")
-
-    ndvi = (nir - red) / (nir + red)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ndvi = (nir - red) / (nir + red)
 
     ndvi_mean = float(np.nanmean(ndvi))
 
-    return round(ndvi_mean, 4)
\ No newline at end of file
+    return round(ndvi_mean, 4)
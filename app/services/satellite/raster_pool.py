@@ -0,0 +1,158 @@
+"""
+Process pool for CPU-heavy raster math.
+
+Arrays are handed to workers through shared memory blocks rather than
+pickled, so only block names, shapes and dtypes cross the process boundary.
+Each task reports how long it waited in the queue and how long it computed.
+"""
+import atexit
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.metrics import STAGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+TaskTiming = namedtuple("TaskTiming", ["queued", "compute", "total", "inline"])
+
+_executor = None
+_executor_lock = threading.Lock()
+
+_pending = 0
+_pending_lock = threading.Lock()
+
+
+def worker_count():
+    # Every web worker has its own pool, so the cores are split among them
+    if settings.RASTER_WORKERS is None:
+        return max(1, (os.cpu_count() or 1) // max(1, settings.WEB_CONCURRENCY))
+    return settings.RASTER_WORKERS
+
+
+def get_executor():
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            # Workers must share the parent's tracker so attaching to a block
+            # in a worker does not schedule a second unlink of it
+            resource_tracker.ensure_running()
+            # Forking a threaded web worker can copy held locks (GDAL, the
+            # event loop's) into the child; forkserver starts clean ones
+            _executor = ProcessPoolExecutor(
+                max_workers=worker_count(),
+                mp_context=multiprocessing.get_context("forkserver"),
+            )
+            atexit.register(shutdown)
+
+    return _executor
+
+
+def pending_tasks():
+    """Tasks submitted to the pool that have not completed yet."""
+    return _pending
+
+
+def _track_pending(delta):
+    global _pending
+
+    with _pending_lock:
+        _pending += delta
+
+
+def shutdown():
+    global _executor
+
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+# =========================
+# SHARED MEMORY TRANSFER
+# =========================
+def _share(array):
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+    view[...] = array
+    del view
+
+    return shm, (shm.name, array.shape, array.dtype.str)
+
+
+def _run_shared(fn, specs, submitted_at):
+    started_at = time.monotonic()
+
+    blocks = [shared_memory.SharedMemory(name=name) for name, _, _ in specs]
+    try:
+        arrays = [
+            np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+            for shm, (_, shape, dtype) in zip(blocks, specs)
+        ]
+        result = fn(*arrays)
+        del arrays
+    finally:
+        for shm in blocks:
+            shm.close()
+
+    return result, started_at - submitted_at, time.monotonic() - started_at
+
+
+# =========================
+# TASK SUBMISSION
+# =========================
+def run_raster_task(fn, *arrays):
+    """
+    Run `fn(*arrays)` on the raster pool and return (result, TaskTiming).
+
+    `fn` must be a module-level function returning a small, picklable value.
+    Small inputs, or RASTER_WORKERS=0, are computed inline since the IPC
+    round trip would cost more than the math.
+    """
+    submitted_at = time.monotonic()
+    pixels = sum(array.size for array in arrays)
+
+    if worker_count() == 0 or pixels < settings.RASTER_POOL_MIN_PIXELS:
+        result = fn(*arrays)
+        elapsed = time.monotonic() - submitted_at
+        return result, TaskTiming(0.0, elapsed, elapsed, True)
+
+    blocks = []
+    _track_pending(1)
+    try:
+        specs = []
+        for array in arrays:
+            shm, spec = _share(np.ascontiguousarray(array))
+            blocks.append(shm)
+            specs.append(spec)
+
+        future = get_executor().submit(_run_shared, fn, specs, submitted_at)
+        result, queued, compute = future.result(
+            timeout=settings.RASTER_TASK_TIMEOUT_SECONDS
+        )
+    finally:
+        _track_pending(-1)
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+    timing = TaskTiming(queued, compute, time.monotonic() - submitted_at, False)
+    STAGE_SECONDS.labels(stage="raster_queue").observe(timing.queued)
+    STAGE_SECONDS.labels(stage="raster_worker").observe(timing.compute)
+    logger.debug(
+        "raster task %s: %d px, queued %.1f ms, compute %.1f ms, total %.1f ms",
+        fn.__name__, pixels,
+        timing.queued * 1000, timing.compute * 1000, timing.total * 1000,
+    )
+
+    return result, timing
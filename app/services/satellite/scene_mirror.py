@@ -0,0 +1,208 @@
+"""
+Mirror Sentinel-2 scenes into a local scene catalog.
+
+For every scene published since `--since` that intersects registered fields,
+the red and NIR bands are read from the STAC API's hrefs, cropped to the
+window covering those fields (plus a buffer) and written as COGs with the
+scene's STAC item under SCENE_CATALOG_DIR. The crop stays on the scene's
+native pixel grid, so NDVI from the mirror matches NDVI from the source.
+
+    python -m app.services.satellite.scene_mirror --since 2026-06-01
+    SCENE_SOURCE=local uvicorn app.main:app ...
+
+Catalog layout:
+    <root>/items/<scene id>.json
+    <root>/assets/<scene id>/B04.tif, B08.tif
+"""
+import argparse
+import json
+import logging
+import math
+import os
+from datetime import datetime
+
+import rasterio
+from rasterio.warp import transform_bounds, transform_geom
+from rasterio.errors import WindowError
+from rasterio.windows import Window, from_bounds
+from rasterio.windows import bounds as window_bounds
+from shapely.geometry import box, mapping, shape
+from sqlalchemy import func
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.field import Field
+from app.services.satellite.cog import write_cog
+from app.services.satellite.coverage import fields_extent
+from app.services.satellite.gdal_env import gdal_env, track_http
+from app.services.satellite.scene_source import (
+    NIR_ASSET,
+    RED_ASSET,
+    StacApiSource,
+)
+
+logger = logging.getLogger(__name__)
+
+# Margin around the fields, so small edits to a boundary stay inside the mirror
+DEFAULT_BUFFER_M = 200
+
+
+def _field_bounds(db, footprint_geojson, user_id=None):
+    footprint = func.ST_SetSRID(
+        func.ST_GeomFromGeoJSON(json.dumps(footprint_geojson)), 4326
+    )
+    query = (
+        db.query(Field.bbox_west, Field.bbox_south, Field.bbox_east, Field.bbox_north)
+        .filter(func.ST_Intersects(Field.geometry, footprint))
+        .filter(Field.deleted_at.is_(None))
+    )
+    if user_id is not None:
+        query = query.filter(Field.user_id == user_id)
+
+    return query.all()
+
+
+def fields_window(src, field_bounds, buffer_m=DEFAULT_BUFFER_M):
+    """
+    Pixel window of `src` covering every (west, south, east, north) box in
+    `field_bounds` plus `buffer_m`, snapped outwards to whole pixels.
+    None when the fields fall outside the raster.
+    """
+    projected = [
+        transform_bounds("EPSG:4326", src.crs, *bounds) for bounds in field_bounds
+    ]
+    left = min(b[0] for b in projected) - buffer_m
+    bottom = min(b[1] for b in projected) - buffer_m
+    right = max(b[2] for b in projected) + buffer_m
+    top = max(b[3] for b in projected) + buffer_m
+
+    window = from_bounds(left, bottom, right, top, src.transform)
+    col_off = math.floor(window.col_off)
+    row_off = math.floor(window.row_off)
+    window = Window(
+        col_off,
+        row_off,
+        math.ceil(window.col_off + window.width) - col_off,
+        math.ceil(window.row_off + window.height) - row_off,
+    )
+
+    try:
+        return window.intersection(Window(0, 0, src.width, src.height))
+    except WindowError:
+        return None
+
+
+def write_item(root, scene, footprint, created=None):
+    """Write the local STAC item for a mirrored scene; returns its path."""
+    items_dir = os.path.join(root, "items")
+    os.makedirs(items_dir, exist_ok=True)
+
+    item = {
+        "type": "Feature",
+        "stac_version": "1.0.0",
+        "id": scene["id"],
+        "bbox": list(footprint.bounds),
+        "geometry": mapping(footprint),
+        "properties": {
+            "datetime": scene["date"],
+            "created": (created or datetime.utcnow()).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        },
+        "assets": {
+            asset: {
+                "href": f"../assets/{scene['id']}/{asset}.tif",
+                "type": "image/tiff; application=geotiff; profile=cloud-optimized",
+            }
+            for asset in (RED_ASSET, NIR_ASSET)
+        },
+        "links": [],
+    }
+
+    # Written under a temporary name and renamed, so a running catalog never
+    # indexes a half-written item
+    path = os.path.join(items_dir, f"{scene['id']}.json")
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(item, f)
+    os.replace(tmp_path, path)
+
+    return path
+
+
+def mirror_scene(db, scene, root, buffer_m=DEFAULT_BUFFER_M, user_id=None):
+    """Mirror the part of `scene` covering registered fields. Returns True if written."""
+    field_bounds = _field_bounds(db, scene["geometry"], user_id)
+    if not field_bounds:
+        return False
+
+    with gdal_env(), track_http("scene_mirror") as http:
+        with rasterio.open(scene["red"]) as red_src, rasterio.open(scene["nir"]) as nir_src:
+            window = fields_window(red_src, field_bounds, buffer_m)
+            if window is None:
+                return False
+
+            for asset, src in ((RED_ASSET, red_src), (NIR_ASSET, nir_src)):
+                path = os.path.join(root, "assets", scene["id"], f"{asset}.tif")
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                write_cog(
+                    path,
+                    src.read(1, window=window),
+                    src.crs,
+                    src.window_transform(window),
+                    src.nodata,
+                )
+
+            projected = box(*window_bounds(window, red_src.transform))
+            footprint = transform_geom(red_src.crs, "EPSG:4326", mapping(projected))
+
+    # The mirror only covers the window, so that is the item's footprint
+    write_item(root, scene, shape(footprint).intersection(shape(scene["geometry"])))
+
+    logger.info(
+        "Mirrored %s: %sx%s px for %s fields, %s HTTP requests, %s bytes",
+        scene["id"], int(window.width), int(window.height), len(field_bounds),
+        http.requests, http.bytes,
+    )
+    return True
+
+
+def mirror(db, since, root, buffer_m=DEFAULT_BUFFER_M, user_id=None):
+    """Mirror every scene published since `since`; returns the count written."""
+    bbox = fields_extent(db, user_id)
+    if bbox is None:
+        return 0
+
+    source = StacApiSource(settings.STAC_API_URL)
+    written = 0
+    for scene in source.scenes_since(since, bbox):
+        if mirror_scene(db, scene, root, buffer_m, user_id):
+            written += 1
+
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mirror Sentinel-2 scenes locally")
+    parser.add_argument(
+        "--since",
+        required=True,
+        type=datetime.fromisoformat,
+        help="mirror scenes published after this date (YYYY-MM-DD)",
+    )
+    parser.add_argument("--root", default=settings.SCENE_CATALOG_DIR)
+    parser.add_argument("--buffer-m", type=float, default=DEFAULT_BUFFER_M)
+    parser.add_argument("--user-id", type=int, help="only this user's fields")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    db = SessionLocal()
+    try:
+        written = mirror(db, args.since, args.root, args.buffer_m, args.user_id)
+    finally:
+        db.close()
+
+    logger.info("Mirrored %s scenes into %s", written, args.root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+"""
+Organization-wide NDVI refresh.
+
+Instead of pulling analyses per field, the refresh walks every Sentinel-2
+scene published since the previous run, joins its footprint against the
+GiST-indexed `fields` table and computes every field the footprint fully
+covers (across all users) from a single open of the scene's bands. A
+partial result would be stored as the date's value and keep the adjacent
+tile from ever writing the complete one, so fields straddling tile edges
+are computed afterwards from all of the day's tiles together, each part
+of the field read from one tile.
+
+Run once (cron / k8s CronJob):
+    python -m app.services.satellite.scene_refresh
+or as a long-lived scheduler:
+    python -m app.services.satellite.scene_refresh --loop
+"""
+import argparse
+import itertools
+import json
+import logging
+import math
+import time
+from datetime import datetime, timedelta
+
+import rasterio
+import shapely
+from geoalchemy2.shape import from_shape, to_shape
+from shapely.geometry import MultiPolygon, shape
+from sqlalchemy import bindparam, func, select
+
+from app.core.config import settings
+from app.db.database import engine
+from app.db.session import SessionLocal
+from app.models.field import Field
+from app.models.field_analysis import FieldAnalysis
+from app.models.scene_refresh_run import SceneRefreshRun
+from app.services.ndvi_summary import record_analyses
+from app.services.satellite.coverage import fields_extents
+from app.services.satellite.gdal_env import gdal_env, track_http
+from app.services.satellite.sentinel_loader import parse_scene_date, search_scenes_since
+from app.services.satellite.ndvi_processor import (
+    compute_ndvi_from_datasets,
+    compute_ndvi_mosaic,
+)
+
+logger = logging.getLogger(__name__)
+
+# Postgres advisory lock key so only one replica refreshes at a time
+REFRESH_LOCK_KEY = 260026
+
+
+def _fields_in_footprint(db, footprint_geojson, scene_date):
+    footprint = func.ST_SetSRID(
+        func.ST_GeomFromGeoJSON(json.dumps(footprint_geojson)), 4326
+    )
+    already_analyzed = select(FieldAnalysis.field_id).where(
+        FieldAnalysis.scene_date == scene_date
+    )
+
+    return (
+        db.query(Field.id, Field.geometry)
+        .filter(func.ST_CoveredBy(Field.geometry, footprint))
+        .filter(Field.deleted_at.is_(None))
+        .filter(Field.id.not_in(already_analyzed))
+        .all()
+    )
+
+
+def _fields_across_footprints(db, footprint, scene_dates):
+    """Live fields `footprint` covers with no analysis at any of `scene_dates` yet."""
+    already_analyzed = select(FieldAnalysis.field_id).where(
+        FieldAnalysis.scene_date.in_(scene_dates)
+    )
+
+    return (
+        db.query(Field.id, Field.geometry)
+        .filter(func.ST_CoveredBy(
+            Field.geometry,
+            func.ST_GeomFromText(bindparam("footprint", footprint.wkt), 4326),
+        ))
+        .filter(Field.deleted_at.is_(None))
+        .filter(Field.id.not_in(already_analyzed))
+        .all()
+    )
+
+
+def _scenes_since(since, extents):
+    """New scenes over any of `extents`, each once, oldest acquisition first."""
+    scenes = {}
+    for bbox in extents:
+        for scene in search_scenes_since(since, bbox):
+            scenes.setdefault(scene["id"], scene)
+
+    return sorted(
+        scenes.values(), key=lambda scene: (parse_scene_date(scene["date"]), scene["id"])
+    )
+
+
+# =========================
+# SCENE PROCESSING
+# =========================
+def process_scene(db, scene):
+    """
+    Compute NDVI for every field covered by `scene`, opening each band once.
+    Returns the number of FieldAnalysis rows written.
+    """
+    scene_date = parse_scene_date(scene["date"])
+    fields = _fields_in_footprint(db, scene["geometry"], scene_date)
+
+    if not fields:
+        return 0
+
+    rows = []
+
+    with gdal_env(), track_http("scene_refresh") as http:
+        with rasterio.open(scene["red"]) as red_src, rasterio.open(scene["nir"]) as nir_src:
+            for field_id, geometry in fields:
+                try:
+                    ndvi_mean = compute_ndvi_from_datasets(
+                        red_src, nir_src, field_id, geometry
+                    )
+                except ValueError:
+                    # Footprint covers it, but the field lies outside the raster
+                    continue
+
+                if math.isnan(ndvi_mean):
+                    continue
+
+                rows.append({
+                    "field_id": field_id,
+                    "ndvi_mean": ndvi_mean,
+                    "scene_date": scene_date,
+                    "created_at": datetime.utcnow(),
+                })
+
+    logger.info(
+        "Scene %s: %s fields, %s HTTP requests, %s bytes",
+        scene["id"], len(fields), http.requests, http.bytes,
+    )
+
+    # Results another run or an overlapping scene already stored are
+    # skipped, so they never count twice in the summaries
+    written = record_analyses(db, rows)
+    db.commit()
+
+    return written
+
+
+def _field_parts(geometry, footprints):
+    """
+    (scene, piece) pairs cutting the field `geometry` along the scenes'
+    footprints; overlaps go to the first scene that contains them.
+    """
+    remaining = to_shape(geometry)
+    parts = []
+
+    for scene, footprint in footprints:
+        if not remaining.intersects(footprint):
+            continue
+
+        # Cuts along footprint edges can leave slivers of lines and points
+        polygons = [
+            part
+            for part in shapely.get_parts(shapely.get_parts(remaining.intersection(footprint)))
+            if part.geom_type == "Polygon" and part.area > 0
+        ]
+        if polygons:
+            parts.append((scene, from_shape(MultiPolygon(polygons), srid=4326)))
+
+        remaining = remaining.difference(footprint)
+        if remaining.is_empty:
+            break
+
+    return parts
+
+
+def process_tile_edges(db, scenes):
+    """
+    Compute NDVI for the fields that none of `scenes`, one acquisition day's
+    tiles, covers alone but their footprints cover together. Results are
+    stored under the day's first scene date. Returns the number of
+    FieldAnalysis rows written.
+    """
+    footprints = [(scene, shape(scene["geometry"])) for scene in scenes]
+    scene_dates = [parse_scene_date(scene["date"]) for scene in scenes]
+    fields = _fields_across_footprints(
+        db, shapely.union_all([footprint for _, footprint in footprints]), scene_dates
+    )
+
+    if not fields:
+        return 0
+
+    rows = []
+    for field_id, geometry in fields:
+        try:
+            ndvi_mean = compute_ndvi_mosaic(field_id, _field_parts(geometry, footprints))
+        except ValueError:
+            continue
+
+        if math.isnan(ndvi_mean):
+            continue
+
+        rows.append({
+            "field_id": field_id,
+            "ndvi_mean": ndvi_mean,
+            "scene_date": scene_dates[0],
+            "created_at": datetime.utcnow(),
+        })
+
+    logger.info(
+        "Tile edges of %s scenes on %s: %s fields",
+        len(scenes), scene_dates[0].date(), len(fields),
+    )
+
+    written = record_analyses(db, rows)
+    db.commit()
+
+    return written
+
+
+# =========================
+# REFRESH RUN
+# =========================
+def run_refresh(db):
+    """
+    Process every scene published since the last successful run. Returns the
+    SceneRefreshRun record, or None when another replica holds the lock.
+    """
+    with engine.connect() as lock_conn:
+        locked = lock_conn.execute(
+            select(func.pg_try_advisory_lock(REFRESH_LOCK_KEY))
+        ).scalar()
+
+        if not locked:
+            logger.info("Scene refresh already running elsewhere, skipping")
+            return None
+
+        try:
+            return _run_locked(db)
+        finally:
+            lock_conn.execute(select(func.pg_advisory_unlock(REFRESH_LOCK_KEY)))
+
+
+def _run_locked(db):
+    last_run = (
+        db.query(SceneRefreshRun)
+        .filter(SceneRefreshRun.status == "success")
+        .order_by(SceneRefreshRun.started_at.desc())
+        .first()
+    )
+
+    if last_run:
+        since = last_run.started_at
+    else:
+        since = datetime.utcnow() - timedelta(days=settings.REFRESH_INITIAL_LOOKBACK_DAYS)
+
+    run = SceneRefreshRun(since=since)
+    db.add(run)
+    db.commit()
+
+    try:
+        extents = fields_extents(db, settings.REFRESH_SEARCH_CELL_DEGREES)
+        scenes = _scenes_since(since, extents)
+        for _, day_scenes in itertools.groupby(
+            scenes, key=lambda scene: parse_scene_date(scene["date"]).date()
+        ):
+            day_scenes = list(day_scenes)
+            for scene in day_scenes:
+                run.analyses_written += process_scene(db, scene)
+                run.scenes_processed += 1
+
+            if len(day_scenes) > 1:
+                run.analyses_written += process_tile_edges(db, day_scenes)
+
+        run.status = "success"
+    except Exception:
+        db.rollback()
+        run.status = "failed"
+        raise
+    finally:
+        run.finished_at = datetime.utcnow()
+        db.commit()
+        logger.info(
+            "Scene refresh %s: %s scenes, %s analyses",
+            run.status, run.scenes_processed, run.analyses_written,
+        )
+
+    return run
+
+
+# =========================
+# SCHEDULER
+# =========================
+def _seconds_until_next_run(now):
+    next_run = now.replace(
+        hour=settings.REFRESH_HOUR_UTC, minute=0, second=0, microsecond=0
+    )
+    if next_run <= now:
+        next_run += timedelta(days=1)
+
+    return (next_run - now).total_seconds()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scene-major NDVI refresh")
+    parser.add_argument(
+        "--loop",
+        action="store_true",
+        help="keep running and refresh daily at REFRESH_HOUR_UTC",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    while True:
+        if args.loop:
+            time.sleep(_seconds_until_next_run(datetime.utcnow()))
+
+        db = SessionLocal()
+        try:
+            run_refresh(db)
+        except Exception:
+            if not args.loop:
+                raise
+            logger.exception("Scene refresh failed")
+        finally:
+            db.close()
+
+        if not args.loop:
+            break
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Where Sentinel-2 scenes come from.
+
+SCENE_SOURCE selects the backend used by `sentinel_loader`:
+
+- "stac": the public Earth Search STAC API, band hrefs on S3 (default)
+- "local": a directory catalog written by `scene_mirror`. Every scene is a
+  STAC item JSON under <SCENE_CATALOG_DIR>/items/ whose band assets are COGs
+  on local disk, so analyses run without network access and with
+  reproducible read performance.
+
+Both return the same scene dicts ({"id", "red", "nir", "date", "geometry"});
+`compute_ndvi` opens the band hrefs as given, local paths included.
+"""
+import glob
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+
+import requests
+
+from app.core.config import settings
+from app.core.metrics import observe_stage
+
+STAC_PAGE_SIZE = 100
+
+# Sentinel-2 asset keys of the bands the NDVI needs
+RED_ASSET = "B04"
+NIR_ASSET = "B08"
+
+
+def scene_from_item(item, base_dir=None):
+    """Scene dict for a STAC item; relative hrefs resolve against `base_dir`."""
+    hrefs = {}
+    for band, asset in (("red", RED_ASSET), ("nir", NIR_ASSET)):
+        href = item["assets"][asset]["href"]
+        if base_dir is not None and "://" not in href and not os.path.isabs(href):
+            href = os.path.normpath(os.path.join(base_dir, href))
+        hrefs[band] = href
+
+    return {
+        "id": item["id"],
+        "red": hrefs["red"],
+        "nir": hrefs["nir"],
+        "date": item["properties"]["datetime"],
+        "geometry": item["geometry"],
+    }
+
+
+def parse_scene_date(value):
+    """STAC datetime string as naive UTC, as stored in FieldAnalysis.scene_date."""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _bbox_intersects(a, b):
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+class SceneSource(ABC):
+    @abstractmethod
+    def latest_scene(self, bbox):
+        """Most recent scene covering `bbox`, or None."""
+
+    @abstractmethod
+    def scenes_since(self, since, bbox=None):
+        """Scenes added to the catalog after `since`, oldest acquisition first."""
+
+
+# =========================
+# STAC API
+# =========================
+class StacApiSource(SceneSource):
+    def __init__(self, url):
+        self.url = url
+
+    def latest_scene(self, bbox):
+        payload = {
+            "collections": ["sentinel-2-l2a"],
+            "bbox": bbox,
+            "limit": 1,
+            "sortby": [{"field": "properties.datetime", "direction": "desc"}],
+        }
+
+        with observe_stage("stac_search"):
+            response = requests.post(self.url, json=payload)
+            response.raise_for_status()
+
+        data = response.json()
+
+        if not data["features"]:
+            return None
+
+        return scene_from_item(data["features"][0])
+
+    def scenes_since(self, since, bbox=None):
+        """Follows STAC pagination links until the result set is exhausted."""
+        payload = {
+            "collections": ["sentinel-2-l2a"],
+            "limit": STAC_PAGE_SIZE,
+            "query": {"created": {"gt": since.strftime("%Y-%m-%dT%H:%M:%SZ")}},
+            "sortby": [{"field": "properties.datetime", "direction": "asc"}],
+        }
+        if bbox is not None:
+            payload["bbox"] = bbox
+
+        url = self.url
+
+        with requests.Session() as http:
+            while url:
+                with observe_stage("stac_search"):
+                    response = http.post(url, json=payload)
+                    response.raise_for_status()
+
+                data = response.json()
+
+                for item in data["features"]:
+                    yield scene_from_item(item)
+
+                next_link = next(
+                    (link for link in data.get("links", []) if link.get("rel") == "next"),
+                    None,
+                )
+                if next_link is None or not data["features"]:
+                    break
+
+                url = next_link["href"]
+                body = next_link.get("body")
+                if body:
+                    payload = {**payload, **body} if next_link.get("merge") else body
+
+
+# =========================
+# LOCAL DIRECTORY CATALOG
+# =========================
+class LocalCatalogSource(SceneSource):
+    """
+    Static catalog of STAC item files under `<root>/items/`. The index is
+    kept in memory and reloaded when the directory changes, so scenes
+    mirrored by a running `scene_mirror` show up without a restart.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.items_dir = os.path.join(root, "items")
+        self._lock = threading.Lock()
+        self._index = []
+        self._index_mtime = None
+
+    def _entries(self):
+        try:
+            mtime = os.stat(self.items_dir).st_mtime_ns
+        except FileNotFoundError:
+            return []
+
+        with self._lock:
+            if mtime != self._index_mtime:
+                self._index = self._load()
+                self._index_mtime = mtime
+            return self._index
+
+    def _load(self):
+        entries = []
+        for path in glob.glob(os.path.join(self.items_dir, "*.json")):
+            with open(path) as f:
+                item = json.load(f)
+
+            acquired = parse_scene_date(item["properties"]["datetime"])
+            created = item["properties"].get("created")
+            entries.append({
+                "bbox": item["bbox"],
+                "acquired": acquired,
+                "created": parse_scene_date(created) if created else acquired,
+                "scene": scene_from_item(item, base_dir=os.path.dirname(path)),
+            })
+
+        entries.sort(key=lambda entry: (entry["acquired"], entry["scene"]["id"]))
+        return entries
+
+    def latest_scene(self, bbox):
+        with observe_stage("stac_search"):
+            matches = [
+                entry for entry in self._entries()
+                if _bbox_intersects(entry["bbox"], bbox)
+            ]
+
+        return matches[-1]["scene"] if matches else None
+
+    def scenes_since(self, since, bbox=None):
+        for entry in self._entries():
+            if entry["created"] <= since:
+                continue
+            if bbox is not None and not _bbox_intersects(entry["bbox"], bbox):
+                continue
+            yield entry["scene"]
+
+
+SCENE_SOURCES = ("stac", "local")
+
+_source = None
+
+
+def get_scene_source():
+    """The process-wide scene source selected by SCENE_SOURCE."""
+    global _source
+
+    if _source is None:
+        if settings.SCENE_SOURCE == "local":
+            _source = LocalCatalogSource(settings.SCENE_CATALOG_DIR)
+        elif settings.SCENE_SOURCE == "stac":
+            _source = StacApiSource(settings.STAC_API_URL)
+        else:
+            raise ValueError(
+                f"SCENE_SOURCE must be one of {', '.join(SCENE_SOURCES)}"
+            )
+
+    return _source
@@ -1,29 +1,13 @@
-import requests
-
-
-STAC_URL = "https://earth-search.aws.element84.com/v1/search"
+from app.services.satellite.scene_source import get_scene_source, parse_scene_date  # noqa: F401
 
 
 def search_latest_scene(bbox):
-    payload = {
-        "collections": ["sentinel-2-l2a"],
-        "bbox": bbox,
-        "limit": 1,
-        "sortby": [{"field": "properties.datetime", "direction": "desc"}],
-    }
-
-    response = requests.post(STAC_URL, json=payload)
-    response.raise_for_status()
-
-    data = response.json()
-
-    if not data["features"]:
-        return None
+    return get_scene_source().latest_scene(bbox)
 
-    item = data["features"][0]
 
-    return {
-        "red": item["assets"]["B04"]["href"],
-        "nir": item["assets"]["B08"]["href"],
-        "date": item["properties"]["datetime"],
-    }
\ No newline at end of file
+def search_scenes_since(since, bbox=None):
+    """
+    Yield every Sentinel-2 L2A scene published to the catalog after `since`,
+    from the configured scene source.
+    """
+    return get_scene_source().scenes_since(since, bbox)
@@ -0,0 +1,197 @@
+"""
+Field API benchmarks through the real ASGI app and a real PostGIS database.
+
+Point DATABASE_URL at a scratch database; the suite creates the schema if
+needed and removes every bench-* user it created when done.
+"""
+import uuid
+
+from sqlalchemy import text
+
+from benchmarks.harness import measure, measure_concurrent
+
+FIELD_COUNTS = (10, 1000, 100000)
+# In-flight requests for the concurrent list benchmark; the handlers await
+# the database instead of holding a threadpool thread each
+CONCURRENCY_LEVELS = (1, 16, 64)
+BENCH_PASSWORD = "bench-password"
+
+FIELD_PAYLOAD = {
+    "type": "Feature",
+    "geometry": {
+        "type": "Polygon",
+        "coordinates": [[
+            [13.40, 52.50], [13.41, 52.50], [13.41, 52.51],
+            [13.40, 52.51], [13.40, 52.50],
+        ]],
+    },
+}
+
+# Grid of 0.001 degree squares, 1000 per row, owned by one user
+SEED_FIELDS_SQL = text("""
+    INSERT INTO fields (
+        user_id, area_hectares, ndvi_status,
+        geometry, geometry_medium, geometry_low,
+        bbox_west, bbox_south, bbox_east, bbox_north,
+        centroid, perimeter_m, vertex_count
+    )
+    SELECT :user_id, 0.75, 'Moderate', envelope, envelope, envelope,
+           ST_XMin(envelope), ST_YMin(envelope), ST_XMax(envelope), ST_YMax(envelope),
+           ST_Centroid(envelope), ST_Perimeter(envelope::geography), 5
+    FROM (
+        SELECT ST_Multi(ST_MakeEnvelope(x, y, x + 0.001, y + 0.001, 4326)) AS envelope
+        FROM (
+            SELECT 10 + (i % 1000) * 0.002 AS x, 45 + (i / 1000) * 0.002 AS y
+            FROM generate_series(0, :count - 1) AS i
+        ) AS grid
+    ) AS envelopes
+""")
+
+
+def _prepare_schema(engine):
+    import app.db.base  # noqa: F401  registers every model on Base.metadata
+    from app.db.database import Base
+
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS postgis"))
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+    Base.metadata.create_all(engine)
+
+
+def _login(client, engine, label):
+    email = f"bench-{label}-{uuid.uuid4().hex[:8]}@example.com"
+
+    client.post("/api/v1/register", params={"email": email, "password": BENCH_PASSWORD})
+    response = client.post(
+        "/api/v1/login", params={"email": email, "password": BENCH_PASSWORD}
+    )
+    response.raise_for_status()
+
+    with engine.connect() as conn:
+        user_id = conn.execute(
+            text("SELECT id FROM users WHERE email = :email"), {"email": email}
+        ).scalar_one()
+
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    return user_id, headers
+
+
+def _cleanup(engine):
+    with engine.begin() as conn:
+        conn.execute(text("""
+            DELETE FROM fields WHERE user_id IN (
+                SELECT id FROM users WHERE email LIKE 'bench-%@example.com'
+            )
+        """))
+        conn.execute(text("DELETE FROM users WHERE email LIKE 'bench-%@example.com'"))
+
+
+def _checked(response):
+    response.raise_for_status()
+    return response
+
+
+def _concurrent_lists(client, app, headers, iterations, count):
+    import httpx
+
+    async_client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench"
+    )
+
+    async def list_first_page():
+        response = await async_client.get(
+            "/api/v1/fields", params={"limit": 100}, headers=headers
+        )
+        response.raise_for_status()
+
+    try:
+        return [
+            measure_concurrent(
+                "list_fields_concurrent",
+                client.portal,
+                list_first_page,
+                iterations * concurrency,
+                concurrency,
+                fields=count,
+            )
+            for concurrency in CONCURRENCY_LEVELS
+        ]
+    finally:
+        client.portal.call(async_client.aclose)
+
+
+def run(iterations, field_counts=FIELD_COUNTS):
+    from fastapi.testclient import TestClient
+
+    from app.core.config import settings
+    from app.db.database import async_engine, engine
+    from app.main import app
+
+    # SQL echo would dominate every timing
+    engine.echo = False
+    async_engine.echo = False
+    # One user hammers each route; the limits would turn timings into 429s
+    settings.RATE_LIMIT_ENABLED = False
+
+    _prepare_schema(engine)
+    results = []
+
+    # One event loop for the whole run: asyncpg connections are bound to the
+    # loop that opened them
+    with TestClient(app) as client:
+        _run_cases(client, app, engine, iterations, field_counts, results)
+
+    return results
+
+
+def _run_cases(client, app, engine, iterations, field_counts, results):
+    try:
+        _, headers = _login(client, engine, "create")
+        results.append(measure(
+            "create_field",
+            lambda: _checked(client.post("/api/v1/fields", json=FIELD_PAYLOAD, headers=headers)),
+            iterations,
+        ))
+
+        for count in field_counts:
+            user_id, headers = _login(client, engine, str(count))
+            with engine.begin() as conn:
+                conn.execute(SEED_FIELDS_SQL, {"user_id": user_id, "count": count})
+                field_id = conn.execute(
+                    text("SELECT min(id) FROM fields WHERE user_id = :user_id"),
+                    {"user_id": user_id},
+                ).scalar_one()
+
+            last_page = max(count - 100, 0)
+            pages = (
+                ("first_page", 0, "full"),
+                ("last_page", last_page, "full"),
+                ("first_page", 0, "low"),
+            )
+            for label, skip, simplify in pages:
+                results.append(measure(
+                    "list_fields",
+                    lambda: _checked(client.get(
+                        "/api/v1/fields",
+                        params={"skip": skip, "limit": 100, "simplify": simplify},
+                        headers=headers,
+                    )),
+                    iterations,
+                    fields=count,
+                    page=label,
+                    simplify=simplify,
+                ))
+
+            for export in ("geojson", "shapefile"):
+                results.append(measure(
+                    f"export_{export}",
+                    lambda: _checked(client.get(
+                        f"/api/v1/fields/{field_id}/export/{export}", headers=headers
+                    )),
+                    iterations,
+                    fields=count,
+                ))
+
+            results += _concurrent_lists(client, app, headers, iterations, count)
+    finally:
+        _cleanup(engine)
@@ -0,0 +1,102 @@
+"""
+compute_ndvi against synthetic COGs served over HTTP Range requests.
+"""
+import itertools
+import os
+
+from geoalchemy2.shape import from_shape
+
+from benchmarks.fixtures import RangeServer, field_in_scene, make_scene
+from benchmarks.harness import measure
+
+SCENE_SIZES = (1024, 4096)
+LARGE_SCENE_SIZE = 10980
+
+# Field sides in 10 m pixels: 1 ha, 100 ha, 2500 ha, 40000 ha (streamed)
+FIELD_SIDES = (10, 100, 500, 2000)
+
+# Overview resolutions (metres) for the quick-look cases
+QUICKLOOK_RESOLUTIONS = (40, 80)
+
+
+_cold_reads = itertools.count()
+
+
+def _cold_ndvi(compute_ndvi, red_url, nir_url, field_id, geometry, resolution=None):
+    n = next(_cold_reads)
+    return compute_ndvi(
+        f"{red_url}?cold={n}", f"{nir_url}?cold={n}", field_id, geometry, resolution
+    )
+
+
+def run(fixture_dir, iterations, large=False):
+    from app.services.satellite.ndvi_processor import compute_ndvi
+
+    sizes = SCENE_SIZES + ((LARGE_SCENE_SIZE,) if large else ())
+    scenes = {size: make_scene(fixture_dir, size) for size in sizes}
+
+    results = []
+
+    with RangeServer(fixture_dir) as server:
+        for size, paths in scenes.items():
+            red_url = server.url(paths["red"])
+            nir_url = server.url(paths["nir"])
+
+            for field_id, side in enumerate(FIELD_SIDES, start=1):
+                if side + 64 > size:
+                    continue
+
+                geometry = from_shape(field_in_scene(side), srid=4326)
+                requests_before = server.stats["requests"]
+
+                result = measure(
+                    "compute_ndvi",
+                    lambda: compute_ndvi(red_url, nir_url, field_id, geometry),
+                    iterations,
+                    scene_px=size,
+                    field_px=side,
+                )
+                result["http_requests_per_call"] = round(
+                    (server.stats["requests"] - requests_before) / (iterations + 1), 2
+                )
+                result["cog_bytes"] = sum(os.path.getsize(p) for p in paths.values())
+                results.append(result)
+
+                # A fresh query string per call defeats GDAL's per-URL caches,
+                # like the first analysis against a newly published scene
+                requests_before = server.stats["requests"]
+
+                result = measure(
+                    "compute_ndvi_cold",
+                    lambda: _cold_ndvi(
+                        compute_ndvi, red_url, nir_url, field_id, geometry
+                    ),
+                    iterations,
+                    scene_px=size,
+                    field_px=side,
+                )
+                result["http_requests_per_call"] = round(
+                    (server.stats["requests"] - requests_before) / (iterations + 1), 2
+                )
+                results.append(result)
+
+                for resolution in QUICKLOOK_RESOLUTIONS:
+                    bytes_before = server.stats["bytes"]
+
+                    result = measure(
+                        "compute_ndvi_quicklook",
+                        lambda: _cold_ndvi(
+                            compute_ndvi, red_url, nir_url, field_id, geometry,
+                            resolution,
+                        ),
+                        iterations,
+                        scene_px=size,
+                        field_px=side,
+                        resolution_m=resolution,
+                    )
+                    result["http_bytes_per_call"] = round(
+                        (server.stats["bytes"] - bytes_before) / (iterations + 1)
+                    )
+                    results.append(result)
+
+    return results
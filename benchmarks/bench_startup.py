@@ -0,0 +1,42 @@
+"""
+Cold `import app.main` time per APP_ROLE, each in a fresh interpreter, plus
+whether the heavy optional stacks were loaded.
+"""
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.harness import measure
+
+ROLES = ("all", "api", "worker")
+HEAVY_MODULES = ("rasterio", "shapefile", "requests")
+
+PROBE = (
+    "import json, sys; import app.main; "
+    "print(json.dumps({name: name in sys.modules for name in %r}))" % (HEAVY_MODULES,)
+)
+
+
+def _import_app(role):
+    env = {**os.environ, "APP_ROLE": role}
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        env=env, check=True, capture_output=True, text=True,
+    ).stdout
+
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(iterations):
+    results = []
+
+    for role in ROLES:
+        loaded = _import_app(role)
+        result = measure(
+            "import_app_main", lambda: _import_app(role), iterations, role=role
+        )
+        result["loaded_modules"] = sorted(name for name, hit in loaded.items() if hit)
+        results.append(result)
+
+    return results
@@ -0,0 +1,61 @@
+"""
+Compare two benchmark result files.
+
+    python -m benchmarks.compare results/base.json results/head.json
+
+Exits non-zero when any case's p95 regressed by more than --threshold.
+"""
+import argparse
+import json
+import sys
+
+from benchmarks.harness import format_params
+
+
+def _load(path):
+    with open(path) as handle:
+        data = json.load(handle)
+
+    return data, {
+        (result["name"], format_params(result["params"])): result
+        for result in data["results"]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare benchmark results")
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument(
+        "--threshold", type=float, default=0.10,
+        help="allowed relative p95 regression (default 0.10)",
+    )
+    args = parser.parse_args()
+
+    base_meta, base = _load(args.base)
+    head_meta, head = _load(args.head)
+
+    print(f"base {base_meta['commit']}  ->  head {head_meta['commit']}\n")
+
+    regressions = 0
+    for key in sorted(base.keys() & head.keys()):
+        before, after = base[key], head[key]
+        change = (after["p95_ms"] - before["p95_ms"]) / before["p95_ms"] if before["p95_ms"] else 0.0
+        flag = ""
+        if change > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+
+        print(
+            f"{key[0]:<32} {key[1]:<32} p95 {before['p95_ms']:>9.2f} -> "
+            f"{after['p95_ms']:>9.2f} ms ({change:+.1%}){flag}"
+        )
+
+    for key in sorted(head.keys() - base.keys()):
+        print(f"{key[0]:<32} {key[1]:<32} new")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Local fixtures for the benchmarks: synthetic Sentinel-2-like COGs and an
+HTTP server that honours Range requests, so GDAL reads them the same way it
+reads S3 hrefs.
+"""
+import functools
+import multiprocessing
+import os
+import re
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+from rasterio.transform import from_origin
+from rasterio.warp import transform_geom
+from shapely.geometry import box, mapping, shape
+
+from app.services.satellite.cog import write_cog
+
+# Upper-left corner of Sentinel-2 tile 33UVP, so the grid matches real scenes
+SCENE_CRS = "EPSG:32633"
+SCENE_ORIGIN = (399960.0, 5000040.0)
+PIXEL_SIZE = 10.0
+
+
+# =========================
+# SYNTHETIC COGS
+# =========================
+def _band(size, base, seed):
+    rng = np.random.default_rng(seed)
+    ramp = np.linspace(0, 1, size, dtype="float32")
+    data = base + 800 * np.add.outer(ramp, ramp) + rng.normal(0, 40, (size, size))
+    return np.clip(data, 1, 10000).astype("uint16")
+
+
+def make_scene(directory, size):
+    """Create (or reuse) red/NIR COGs of `size` x `size` pixels."""
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+
+    for band, base, seed in (("red", 600, 1), ("nir", 2800, 2)):
+        path = os.path.join(directory, f"{band}_{size}.tif")
+        if not os.path.exists(path):
+            write_cog(
+                path,
+                _band(size, base, seed),
+                SCENE_CRS,
+                from_origin(*SCENE_ORIGIN, PIXEL_SIZE, PIXEL_SIZE),
+            )
+        paths[band] = path
+
+    return paths
+
+
+def field_in_scene(size_px, offset_px=64):
+    """Square field of `size_px` pixels a side inside the scene, in EPSG:4326."""
+    left = SCENE_ORIGIN[0] + offset_px * PIXEL_SIZE
+    top = SCENE_ORIGIN[1] - offset_px * PIXEL_SIZE
+    side = size_px * PIXEL_SIZE
+    projected = box(left, top - side, left + side, top)
+
+    return shape(transform_geom(SCENE_CRS, "EPSG:4326", mapping(projected)))
+
+
+# =========================
+# RANGE HTTP SERVER
+# =========================
+_RANGE = re.compile(r"bytes=(\d*)-(\d*)")
+
+
+class RangeRequestHandler(SimpleHTTPRequestHandler):
+    """
+    Static file handler with single-range support. Counts every request
+    (HEAD, listings and range GETs) and the bytes served by range GETs.
+    """
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_head(self):
+        with self.server.counters.get_lock():
+            self.server.counters[0] += 1
+
+        match = _RANGE.fullmatch(self.headers.get("Range", "").strip())
+        if match is None:
+            return super().send_head()
+
+        path = self.translate_path(self.path)
+        try:
+            handle = open(path, "rb")
+        except OSError:
+            self.send_error(404)
+            return None
+
+        size = os.fstat(handle.fileno()).st_size
+        start, end = match.groups()
+        if start:
+            start = int(start)
+            end = min(int(end), size - 1) if end else size - 1
+        else:
+            start = max(size - int(end), 0)
+            end = size - 1
+
+        if start >= size:
+            handle.close()
+            self.send_error(416)
+            return None
+
+        with self.server.counters.get_lock():
+            self.server.counters[1] += end - start + 1
+
+        self.send_response(206)
+        self.send_header("Content-Type", "image/tiff")
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+
+        handle.seek(start)
+        self._range_remaining = end - start + 1
+        return handle
+
+    def copyfile(self, source, outputfile):
+        remaining = getattr(self, "_range_remaining", None)
+        if remaining is None:
+            return super().copyfile(source, outputfile)
+
+        while remaining > 0:
+            chunk = source.read(min(64 * 1024, remaining))
+            if not chunk:
+                break
+            outputfile.write(chunk)
+            remaining -= len(chunk)
+        self._range_remaining = None
+
+
+def _serve(directory, counters, address):
+    handler = functools.partial(RangeRequestHandler, directory=directory)
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    httpd.counters = counters
+    address.send(httpd.server_address)
+    httpd.serve_forever()
+
+
+class RangeServer:
+    """
+    Serve `directory` on 127.0.0.1 from a child process. A server thread in
+    the benchmark's own interpreter can deadlock with GDAL's blocking reads.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.counters = multiprocessing.Array("q", 2)
+        self.address = None
+        self.process = None
+
+    @property
+    def stats(self):
+        return {"requests": self.counters[0], "bytes": self.counters[1]}
+
+    def url(self, path):
+        host, port = self.address
+        return f"http://{host}:{port}/{os.path.basename(path)}"
+
+    def __enter__(self):
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        self.process = multiprocessing.Process(
+            target=_serve, args=(self.directory, self.counters, sender), daemon=True
+        )
+        self.process.start()
+        self.address = receiver.recv()
+        return self
+
+    def __exit__(self, *exc):
+        self.process.terminate()
+        self.process.join()
@@ -0,0 +1,155 @@
+"""
+Timing helpers shared by the benchmark suites.
+"""
+import os
+import platform
+import resource
+import subprocess
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss_bytes():
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        # No procfs: fall back to the process-wide high-water mark
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class RssSampler:
+    """Track peak resident set size of this process while a case runs."""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.peak = current_rss_bytes()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, current_rss_bytes())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss_bytes())
+
+
+def measure(name, fn, iterations, warmup=1, **params):
+    """
+    Call `fn` `warmup` times untimed, then `iterations` times timed, and
+    return a result record with latency percentiles, throughput and peak RSS.
+    """
+    with RssSampler() as sampler:
+        first = None
+        for _ in range(warmup):
+            started = time.perf_counter()
+            fn()
+            first = first if first is not None else time.perf_counter() - started
+
+        samples = []
+        wall_started = time.perf_counter()
+        for _ in range(iterations):
+            started = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - started)
+        wall = time.perf_counter() - wall_started
+
+    return _summarize(name, params, samples, wall, first, sampler.peak)
+
+
+def measure_concurrent(name, portal, request, iterations, concurrency, **params):
+    """
+    Await the coroutine function `request` `iterations` times on the event
+    loop behind `portal`, keeping at most `concurrency` calls in flight, and
+    return the same result record as `measure`.
+    """
+    import anyio
+
+    async def run_all():
+        limiter = anyio.Semaphore(concurrency)
+        samples = []
+
+        async def one():
+            async with limiter:
+                started = time.perf_counter()
+                await request()
+                samples.append(time.perf_counter() - started)
+
+        async with anyio.create_task_group() as group:
+            for _ in range(iterations):
+                group.start_soon(one)
+
+        return samples
+
+    with RssSampler() as sampler:
+        portal.call(request)
+
+        wall_started = time.perf_counter()
+        samples = portal.call(run_all)
+        wall = time.perf_counter() - wall_started
+
+    params = {**params, "concurrency": concurrency}
+    return _summarize(name, params, samples, wall, None, sampler.peak)
+
+
+def _summarize(name, params, samples, wall, first, peak_rss):
+    iterations = len(samples)
+    latencies = np.array(samples) * 1000
+
+    result = {
+        "name": name,
+        "params": params,
+        "iterations": iterations,
+        "first_ms": round(first * 1000, 3) if first is not None else None,
+        "mean_ms": round(float(latencies.mean()), 3),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 3),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+        "throughput_per_s": round(iterations / wall, 2) if wall else None,
+        "peak_rss_mb": round(peak_rss / (1024 * 1024), 1),
+    }
+
+    print(
+        f"{name:<32} {format_params(params):<32} "
+        f"p50 {result['p50_ms']:>9.2f} ms  p95 {result['p95_ms']:>9.2f} ms  "
+        f"p99 {result['p99_ms']:>9.2f} ms  {result['throughput_per_s']:>8} /s  "
+        f"rss {result['peak_rss_mb']} MB"
+    )
+
+    return result
+
+
+def format_params(params):
+    return " ".join(f"{key}={value}" for key, value in sorted(params.items()))
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_metadata():
+    return {
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }